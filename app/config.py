@@ -1,7 +1,7 @@
 """
 12-factor app configuration using environment variables.
 """
-from typing import Optional
+from typing import List, Optional
 from pydantic_settings import BaseSettings, SettingsConfigDict
 
 
@@ -17,6 +17,12 @@ class Settings(BaseSettings):
     # Logging level
     LOG_LEVEL: str = "INFO"
     
+    # Browser origins allowed to call /messages and /stats (JSON list in env)
+    CORS_ORIGINS: List[str] = ["http://localhost:3000", "http://localhost:8000"]
+    
+    # Have SQLite render /messages rows as JSON (skips per-row Python dicts)
+    FAST_ROWS: bool = False
+    
     model_config = SettingsConfigDict(
         env_file=".env",
         env_file_encoding="utf-8",
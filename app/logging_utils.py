@@ -1,16 +1,47 @@
 """
 Structured JSON logging utilities.
 """
-import json
+import asyncio
 import logging
 import sys
 import time
-import uuid
-from datetime import datetime
-from typing import Any, Dict, Optional
-from starlette.middleware.base import BaseHTTPMiddleware
-from starlette.requests import Request
-from starlette.responses import Response
+from typing import Any, Dict, Optional, Tuple
+import orjson
+
+
+# Logger configured by setup_logging (shared by all callers)
+_logger: Optional[logging.Logger] = None
+
+# Extra record attributes copied into the JSON output, in order
+_LOG_FIELDS = (
+    # Request fields
+    "request_id", "method", "path", "status", "latency_ms",
+    # Webhook-specific fields
+    "message_id", "dup", "result",
+)
+_MISSING = object()
+
+# Last formatted second: (epoch_second, "YYYY-MM-DDTHH:MM:SS")
+_ts_cache: Tuple[int, str] = (0, "")
+
+
+def utc_now_iso() -> str:
+    """
+    Return the current UTC time as ISO-8601 with microseconds and Z suffix.
+    The second-resolution prefix is formatted once per second and reused.
+    
+    Returns:
+        Timestamp string, e.g. 2024-01-01T10:00:00.123456Z
+    """
+    global _ts_cache
+    now = time.time()
+    sec = int(now)
+    cached_sec, prefix = _ts_cache
+    if sec != cached_sec:
+        prefix = time.strftime("%Y-%m-%dT%H:%M:%S", time.gmtime(sec))
+        _ts_cache = (sec, prefix)
+    us = int((now - sec) * 1_000_000)
+    return f"{prefix}.{us:06d}Z"
 
 
 class JSONFormatter(logging.Formatter):
@@ -19,45 +50,72 @@ class JSONFormatter(logging.Formatter):
     def format(self, record: logging.LogRecord) -> str:
         """Format log record as JSON."""
         log_data: Dict[str, Any] = {
-            "ts": datetime.utcnow().isoformat() + "Z",
+            "ts": utc_now_iso(),
             "level": record.levelname,
         }
         
-        # Add request fields if present
-        if hasattr(record, "request_id"):
-            log_data["request_id"] = record.request_id
-        if hasattr(record, "method"):
-            log_data["method"] = record.method
-        if hasattr(record, "path"):
-            log_data["path"] = record.path
-        if hasattr(record, "status"):
-            log_data["status"] = record.status
-        if hasattr(record, "latency_ms"):
-            log_data["latency_ms"] = record.latency_ms
-        
-        # Add webhook-specific fields if present
-        if hasattr(record, "message_id"):
-            log_data["message_id"] = record.message_id
-        if hasattr(record, "dup"):
-            log_data["dup"] = record.dup
-        if hasattr(record, "result"):
-            log_data["result"] = record.result
+        # Add request and webhook-specific fields if present
+        fields = record.__dict__
+        for key in _LOG_FIELDS:
+            value = fields.get(key, _MISSING)
+            if value is not _MISSING:
+                log_data[key] = value
         
-        # Add message if present
-        if record.getMessage():
-            log_data["message"] = record.getMessage()
+        # Add message if present (skip formatting for empty messages)
+        if record.msg or record.args:
+            message = record.getMessage()
+            if message:
+                log_data["message"] = message
         
         # Add exception info if present
         if record.exc_info:
             log_data["exception"] = self.formatException(record.exc_info)
         
         # Ensure valid JSON (one object per line)
-        return json.dumps(log_data, ensure_ascii=False)
+        return orjson.dumps(log_data, default=str).decode("utf-8")
+
+
+class BufferedStreamHandler(logging.StreamHandler):
+    """
+    StreamHandler that batches writes instead of flushing after every record.
+    
+    The stream is flushed once `capacity` records are pending, immediately for
+    WARNING and above, and whenever flush() is called (see flush_logs_periodically).
+    """
+    
+    def __init__(self, stream=None, capacity: int = 64):
+        super().__init__(stream)
+        self.capacity = capacity
+        self._pending = 0
+    
+    def emit(self, record: logging.LogRecord):
+        """Write the formatted record, flushing only when the batch is full."""
+        try:
+            msg = self.format(record)
+            self.stream.write(msg + self.terminator)
+            self._pending += 1
+            if self._pending >= self.capacity or record.levelno >= logging.WARNING:
+                self.flush()
+        except RecursionError:
+            raise
+        except Exception:
+            self.handleError(record)
+    
+    def flush(self):
+        """Flush the stream and reset the pending record count."""
+        self.acquire()
+        try:
+            super().flush()
+            self._pending = 0
+        finally:
+            self.release()
 
 
 def setup_logging(level: str = "INFO") -> logging.Logger:
     """
     Set up structured JSON logging.
+    Idempotent: handlers are only installed on the first call, later calls
+    return the already configured logger.
     
     Args:
         level: Logging level (DEBUG, INFO, WARNING, ERROR, CRITICAL)
@@ -65,6 +123,10 @@ def setup_logging(level: str = "INFO") -> logging.Logger:
     Returns:
         Configured logger instance
     """
+    global _logger
+    if _logger is not None:
+        return _logger
+    
     logger = logging.getLogger("app")
     logger.setLevel(getattr(logging, level.upper()))
     
@@ -72,56 +134,36 @@ def setup_logging(level: str = "INFO") -> logging.Logger:
     logger.handlers.clear()
     
     # Create console handler with JSON formatter
-    handler = logging.StreamHandler(sys.stdout)
+    handler = BufferedStreamHandler(sys.stdout)
     handler.setFormatter(JSONFormatter())
     logger.addHandler(handler)
     
     # Prevent propagation to root logger
     logger.propagate = False
     
+    _logger = logger
     return logger
 
 
-class RequestLoggingMiddleware(BaseHTTPMiddleware):
-    """Middleware to log HTTP requests as structured JSON."""
-    
-    def __init__(self, app, logger: logging.Logger):
-        super().__init__(app)
-        self.logger = logger
+def flush_logs():
+    """Flush all handlers of the configured logger."""
+    if _logger is None:
+        return
+    for handler in _logger.handlers:
+        handler.flush()
+
+
+async def flush_logs_periodically(interval: float = 0.5):
+    """
+    Flush buffered log output every `interval` seconds.
+    Bounds how long a record can sit in the buffer under low traffic.
     
-    async def dispatch(self, request: Request, call_next):
-        """Process request and log structured JSON."""
-        # Generate request ID
-        request_id = str(uuid.uuid4())
-        request.state.request_id = request_id
-        
-        # Record start time
-        start_time = time.time()
-        
-        # Process request
-        try:
-            response = await call_next(request)
-            status_code = response.status_code
-        except Exception as e:
-            status_code = 500
-            raise
-        finally:
-            # Calculate latency
-            latency_ms = round((time.time() - start_time) * 1000, 2)
-            
-            # Log request
-            self.logger.info(
-                "",
-                extra={
-                    "request_id": request_id,
-                    "method": request.method,
-                    "path": request.url.path,
-                    "status": status_code,
-                    "latency_ms": latency_ms,
-                }
-            )
-        
-        return response
+    Args:
+        interval: Seconds between flushes
+    """
+    while True:
+        await asyncio.sleep(interval)
+        flush_logs()
 
 
 def log_webhook_event(
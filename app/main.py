@@ -1,20 +1,30 @@
-from fastapi import FastAPI, Request
+from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
-from fastapi.responses import Response, PlainTextResponse
-from starlette.middleware.base import BaseHTTPMiddleware
+from fastapi.responses import ORJSONResponse, Response, PlainTextResponse
+from starlette.datastructures import MutableHeaders
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
 from contextlib import asynccontextmanager
+import asyncio
 import time
-import uuid
+import secrets
+import sqlite3
 import logging
+from typing import Dict, List, Tuple
 from app.config import settings
 from app.models import init_schema
-from app.logging_utils import setup_logging
+from app.storage import close_pool, init_pool, start_write_batcher, stop_write_batcher
+from app.logging_utils import flush_logs, flush_logs_periodically, setup_logging
 from app.metrics import get_metrics, record_http_request, record_latency
 from app import routers
 
 # Setup logging
 logger = setup_logging(settings.LOG_LEVEL)
 
+# High-frequency machine traffic whose access logs are demoted to DEBUG:
+# everything under /health/ plus these exact paths
+QUIET_PATH_PREFIX = "/health/"
+QUIET_PATHS = ("/metrics", "/favicon.ico")
+
 
 @asynccontextmanager
 async def lifespan(app: FastAPI):
@@ -23,9 +33,19 @@ async def lifespan(app: FastAPI):
     logger.info("Initializing database schema...")
     init_schema()
     logger.info("Database schema initialized")
+    try:
+        init_pool()
+    except sqlite3.OperationalError as e:
+        # Same as init_schema: don't crash startup, the pool is opened on first use
+        logger.warning(f"Could not open database connection pool: {e}")
+    start_write_batcher()
+    flush_task = asyncio.create_task(flush_logs_periodically())
     yield
-    # Shutdown (if needed in the future)
-    pass
+    # Shutdown
+    await stop_write_batcher()
+    flush_task.cancel()
+    close_pool()
+    flush_logs()
 
 
 # Create FastAPI app with lifespan
@@ -33,61 +53,138 @@ app = FastAPI(
     title="FastAPI Backend",
     description="A FastAPI backend application",
     version="1.0.0",
+    default_response_class=ORJSONResponse,
     lifespan=lifespan
 )
 
 
-class RequestLoggingMiddleware(BaseHTTPMiddleware):
-    """Middleware to log HTTP requests and record metrics."""
+class RequestLoggingMiddleware:
+    """Pure ASGI middleware to log HTTP requests and record metrics."""
+    
+    def __init__(self, app: ASGIApp):
+        self.app = app
     
-    async def dispatch(self, request: Request, call_next):
+    async def __call__(self, scope: Scope, receive: Receive, send: Send):
         """Process request, log structured JSON, and record metrics."""
-        # Generate request ID
-        request_id = str(uuid.uuid4())
-        request.state.request_id = request_id
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        
+        # Generate request ID (exposed to handlers via request.state)
+        request_id = secrets.token_hex(16)
+        scope.setdefault("state", {})["request_id"] = request_id
         
         # Record start time
-        start_time = time.time()
+        start = time.perf_counter_ns()
+        status_code = 500
+        
+        async def send_wrapper(message: Message):
+            nonlocal status_code
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+                MutableHeaders(scope=message).append("x-request-id", request_id)
+            await send(message)
         
         # Process request
         try:
-            response = await call_next(request)
-            status_code = response.status_code
-        except Exception as e:
-            status_code = 500
-            raise
+            await self.app(scope, receive, send_wrapper)
         finally:
             # Calculate latency
-            latency_ms = round((time.time() - start_time) * 1000, 2)
+            latency_ms = (time.perf_counter_ns() - start) / 1_000_000
+            path = scope["path"]
             
-            # Log structured JSON
-            logger.info(
-                "",
-                extra={
-                    "request_id": request_id,
-                    "method": request.method,
-                    "path": request.url.path,
-                    "status": status_code,
-                    "latency_ms": latency_ms,
-                }
-            )
+            # Log structured JSON (probes and scrapes only at DEBUG)
+            log_fields = {
+                "request_id": request_id,
+                "method": scope["method"],
+                "path": path,
+                "status": status_code,
+                "latency_ms": latency_ms,
+            }
+            if path.startswith(QUIET_PATH_PREFIX) or path in QUIET_PATHS:
+                if logger.isEnabledFor(logging.DEBUG):
+                    logger.debug("", extra=log_fields)
+            else:
+                logger.info("", extra=log_fields)
             
             # Record metrics
-            record_http_request(request.url.path, status_code)
+            record_http_request(path, status_code)
             record_latency(latency_ms)
-        
-        return response
 
 
-# Configure CORS
+class BrowserCORSMiddleware:
+    """
+    Apply CORSMiddleware only to browser-facing paths.
+    Server-to-server routes (webhook, health probes, metrics) bypass it.
+    A path matches exactly or as a parent segment ("/messages" covers
+    "/messages/x" but not "/messagesfoo").
+    """
+    
+    def __init__(self, app: ASGIApp, paths: Tuple[str, ...], **cors_options):
+        self.app = app
+        self.paths = frozenset(paths)
+        self.prefixes = tuple(path + "/" for path in paths)
+        self.cors = CORSMiddleware(app, **cors_options)
+    
+    def _matches(self, path: str) -> bool:
+        return path in self.paths or path.startswith(self.prefixes)
+    
+    async def __call__(self, scope: Scope, receive: Receive, send: Send):
+        if scope["type"] == "http" and self._matches(scope["path"]):
+            await self.cors(scope, receive, send)
+        else:
+            await self.app(scope, receive, send)
+
+
+class StaticResponseMiddleware:
+    """
+    Serve constant GET responses without entering routing or dependency resolution.
+    The matching routes stay registered so they still appear in the OpenAPI docs.
+    """
+    
+    def __init__(self, app: ASGIApp, responses: Dict[str, Tuple[int, List[Tuple[bytes, bytes]], bytes]]):
+        self.app = app
+        self.responses = responses
+    
+    async def __call__(self, scope: Scope, receive: Receive, send: Send):
+        if scope["type"] == "http" and scope["method"] == "GET":
+            static = self.responses.get(scope["path"])
+            if static is not None:
+                status, headers, body = static
+                await send({"type": "http.response.start", "status": status, "headers": list(headers)})
+                await send({"type": "http.response.body", "body": body})
+                return
+        await self.app(scope, receive, send)
+
+
+# Pre-encoded responses for constant endpoints: path -> (status, headers, body)
+LIVENESS_BODY = b'{"status":"alive"}'
+STATIC_RESPONSES = {
+    "/favicon.ico": (204, [], b""),
+    "/health/live": (
+        200,
+        [
+            (b"content-type", b"application/json"),
+            (b"content-length", str(len(LIVENESS_BODY)).encode()),
+        ],
+        LIVENESS_BODY,
+    ),
+}
+
+
+# Configure CORS (browser-facing endpoints only)
 app.add_middleware(
-    CORSMiddleware,
-    allow_origins=["*"],  # Configure this appropriately for production
+    BrowserCORSMiddleware,
+    paths=("/messages", "/stats"),
+    allow_origins=settings.CORS_ORIGINS,
     allow_credentials=True,
-    allow_methods=["*"],
+    allow_methods=["GET", "OPTIONS"],
     allow_headers=["*"],
 )
 
+# Short-circuit constant endpoints (inside the logger, so they are still logged and counted)
+app.add_middleware(StaticResponseMiddleware, responses=STATIC_RESPONSES)
+
 # Add request logging middleware (after CORS)
 app.add_middleware(RequestLoggingMiddleware)
 
@@ -1,71 +1,101 @@
 """
 Prometheus-style metrics helpers.
 """
-from typing import Dict, Optional, Tuple
-from collections import defaultdict
+from typing import Dict, List, Optional, Tuple
+from bisect import bisect_left
+from functools import lru_cache
 import time
 
 
+# Sorted (label_name, label_value) pairs identifying a series
+LabelKey = Tuple[Tuple[str, str], ...]
+# (metric_name, label_key)
+SeriesKey = Tuple[str, LabelKey]
+
+# Histogram bucket upper bounds (ms); the last bucket catches everything
+HISTOGRAM_BUCKETS = (1, 5, 10, 25, 50, 100, 250, 500, 1000, 2500, 5000, float("inf"))
+_BUCKET_LABELS = tuple("+Inf" if b == float("inf") else str(b) for b in HISTOGRAM_BUCKETS)
+
+
+@lru_cache(maxsize=1024)
+def _sorted_label_key(items: Tuple[Tuple[str, str], ...]) -> LabelKey:
+    """Sort label items into a canonical key (cached, label sets repeat)."""
+    return tuple(sorted(items))
+
+
 class MetricsCollector:
     """Simple metrics collector for Prometheus-style metrics."""
     
     def __init__(self):
-        # Counters: metric_name -> {(label_key, label_value): count}
-        self.counters: Dict[str, Dict[Tuple[str, ...], float]] = defaultdict(lambda: defaultdict(float))
-        # Histogram: metric_name -> {(label_key, label_value): [values]}
-        self.histograms: Dict[str, Dict[Tuple[str, ...], list]] = defaultdict(lambda: defaultdict(list))
+        # Counters: (metric_name, label_key) -> count
+        self.counters: Dict[SeriesKey, float] = {}
+        # Histograms: (metric_name, label_key) -> observation count / sum / per-bucket counts
+        self.hist_count: Dict[SeriesKey, int] = {}
+        self.hist_sum: Dict[SeriesKey, float] = {}
+        self.hist_buckets: Dict[SeriesKey, List[int]] = {}
+        # Rendered label pairs, filled lazily at scrape time: label_key -> 'k="v",...'
+        self._label_str_cache: Dict[LabelKey, str] = {}
         self.start_time = time.time()
     
-    def _build_label_key(self, labels: Optional[Dict[str, str]] = None) -> Tuple[str, ...]:
+    def _build_label_key(self, labels: Optional[Dict[str, str]] = None) -> LabelKey:
         """Build a tuple key from labels dict for hashing."""
         if not labels:
-            return tuple()
-        return tuple(sorted(labels.items()))
+            return ()
+        return _sorted_label_key(tuple(labels.items()))
+    
+    def _label_pairs(self, label_key: LabelKey) -> str:
+        """Render a label key as comma-separated Prometheus label pairs, e.g. k="v"."""
+        label_str = self._label_str_cache.get(label_key)
+        if label_str is None:
+            label_str = self._label_str_cache[label_key] = ",".join(f'{k}="{v}"' for k, v in label_key)
+        return label_str
     
     def increment_counter(self, name: str, labels: Optional[Dict[str, str]] = None, value: float = 1.0):
         """Increment a counter metric."""
-        label_key = self._build_label_key(labels)
-        self.counters[name][label_key] += value
+        key = (name, self._build_label_key(labels))
+        self.counters[key] = self.counters.get(key, 0.0) + value
     
     def observe_histogram(self, name: str, value: float, labels: Optional[Dict[str, str]] = None):
-        """Record a histogram observation."""
-        label_key = self._build_label_key(labels)
-        self.histograms[name][label_key].append(value)
+        """Record a histogram observation into fixed buckets (constant memory)."""
+        key = (name, self._build_label_key(labels))
+        buckets = self.hist_buckets.get(key)
+        if buckets is None:
+            buckets = self.hist_buckets[key] = [0] * len(HISTOGRAM_BUCKETS)
+            self.hist_count[key] = 0
+            self.hist_sum[key] = 0.0
+        buckets[bisect_left(HISTOGRAM_BUCKETS, value)] += 1
+        self.hist_count[key] += 1
+        self.hist_sum[key] += value
     
-    def get_metrics(self) -> str:
+    def get_metrics(self) -> bytes:
         """
         Generate Prometheus-style metrics output in text/plain format.
         
         Returns:
-            String in Prometheus exposition format (text/plain)
+            UTF-8 encoded bytes in Prometheus exposition format (text/plain)
         """
-        lines = []
+        buf = bytearray()
         
         # Format counters
-        for metric_name in sorted(self.counters.keys()):
-            for label_key, value in sorted(self.counters[metric_name].items()):
-                if label_key:
-                    # Build label string from tuple
-                    label_str = ",".join(f'{k}="{v}"' for k, v in label_key)
-                    lines.append(f"{metric_name}{{{label_str}}} {value}")
-                else:
-                    lines.append(f"{metric_name} {value}")
+        for (metric_name, label_key), value in sorted(self.counters.items()):
+            pairs = self._label_pairs(label_key)
+            label_str = f"{{{pairs}}}" if pairs else ""
+            buf += f"{metric_name}{label_str} {value}\n".encode()
         
-        # Format histograms (as summary with count and sum)
-        for metric_name in sorted(self.histograms.keys()):
-            for label_key, values in sorted(self.histograms[metric_name].items()):
-                count = len(values)
-                sum_value = sum(values)
-                
-                if label_key:
-                    label_str = ",".join(f'{k}="{v}"' for k, v in label_key)
-                    lines.append(f"{metric_name}_count{{{label_str}}} {count}")
-                    lines.append(f"{metric_name}_sum{{{label_str}}} {sum_value}")
-                else:
-                    lines.append(f"{metric_name}_count {count}")
-                    lines.append(f"{metric_name}_sum {sum_value}")
+        # Format histograms (cumulative buckets, count and sum)
+        for key, buckets in sorted(self.hist_buckets.items()):
+            metric_name, label_key = key
+            pairs = self._label_pairs(label_key)
+            prefix = f"{pairs}," if pairs else ""
+            cumulative = 0
+            for le, bucket_count in zip(_BUCKET_LABELS, buckets):
+                cumulative += bucket_count
+                buf += f'{metric_name}_bucket{{{prefix}le="{le}"}} {cumulative}\n'.encode()
+            label_str = f"{{{pairs}}}" if pairs else ""
+            buf += f"{metric_name}_count{label_str} {self.hist_count[key]}\n".encode()
+            buf += f"{metric_name}_sum{label_str} {self.hist_sum[key]}\n".encode()
         
-        return "\n".join(lines) + "\n"
+        return bytes(buf)
 
 
 # Global metrics instance
@@ -114,12 +144,12 @@ def record_latency(latency_ms: float, labels: Optional[Dict[str, str]] = None):
     )
 
 
-def get_metrics() -> str:
+def get_metrics() -> bytes:
     """
     Get Prometheus-style metrics output.
     
     Returns:
-        String in Prometheus exposition format (text/plain)
+        UTF-8 encoded bytes in Prometheus exposition format (text/plain)
     """
     return metrics.get_metrics()
 
@@ -3,6 +3,7 @@ SQLite database models and initialization.
 """
 import sqlite3
 from pathlib import Path
+from typing import Optional
 from app.config import settings
 
 
@@ -39,16 +40,81 @@ def parse_database_url(database_url: str) -> str:
     return path
 
 
-def init_db() -> sqlite3.Connection:
+def read_only_uri(db_path: str) -> str:
+    """
+    Build a SQLite URI that opens db_path read-only (mode=ro).
+    The path is percent-encoded, so `?`, `#` and `%` in it are safe.
+    
+    Args:
+        db_path: File path to SQLite database
+    
+    Returns:
+        file: URI for sqlite3.connect(..., uri=True)
+    """
+    return f"{Path(db_path).resolve().as_uri()}?mode=ro"
+
+
+def connect_db(db_path: str, read_only: bool = False) -> sqlite3.Connection:
+    """
+    Open a SQLite connection with the service's connection settings.
+    Connections are in autocommit mode (isolation_level=None); callers that
+    need multi-statement transactions issue BEGIN/COMMIT explicitly.
+    
+    Args:
+        db_path: File path to SQLite database
+        read_only: Open an existing database with a mode=ro URI; SQLite then
+            rejects any write on the connection
+        
+    Returns:
+        Database connection
+    """
+    if read_only:
+        # Journal mode and page size are properties of the file, set by the writer
+        conn = sqlite3.connect(
+            read_only_uri(db_path),
+            uri=True,
+            check_same_thread=False,
+            isolation_level=None
+        )
+    else:
+        conn = sqlite3.connect(db_path, check_same_thread=False, isolation_level=None)
+        
+        # Larger pages for new databases; must precede WAL and the first table
+        # (a no-op on an existing file)
+        conn.execute("PRAGMA page_size=8192")
+        
+        # WAL journal with relaxed fsync: no rollback-journal file per write
+        # transaction, and readers don't block the writer
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.execute("PRAGMA synchronous=NORMAL")
+        conn.execute("PRAGMA wal_autocheckpoint=1000")  # pages
+        
+        # Bound ANALYZE / PRAGMA optimize to sampling ~1000 rows per index
+        conn.execute("PRAGMA analysis_limit=1000")
+    
+    conn.row_factory = sqlite3.Row
+    conn.execute("PRAGMA temp_store=MEMORY")
+    
+    # Read through a memory map (no pread syscalls) and keep hot pages cached;
+    # both are reserved lazily, only touched pages use memory
+    conn.execute("PRAGMA mmap_size=1073741824")  # 1 GiB
+    conn.execute("PRAGMA cache_size=-262144")    # 256 MiB page cache
+    return conn
+
+
+def init_db(db_path: Optional[str] = None) -> sqlite3.Connection:
     """
     Initialize SQLite database and create schema.
-    Creates the messages table if it doesn't exist.
+    Enables WAL mode and creates the messages table and its indexes if they don't exist.
+    
+    Args:
+        db_path: Database file path (defaults to the path in settings.DATABASE_URL)
     
     Returns:
         Database connection
     """
-    # Parse DATABASE_URL to get file path
-    db_path = parse_database_url(settings.DATABASE_URL)
+    if db_path is None:
+        db_path = parse_database_url(settings.DATABASE_URL)
     
     # Create parent directories if they don't exist
     # Handle read-only filesystem gracefully (e.g., in Docker with mounted volumes)
@@ -62,8 +128,7 @@ def init_db() -> sqlite3.Connection:
             pass
     
     # Connect to database
-    conn = sqlite3.connect(db_path, check_same_thread=False)
-    conn.row_factory = sqlite3.Row
+    conn = connect_db(db_path)
     
     # Create messages table with exact schema
     # Note: TEXT PRIMARY KEY in SQLite doesn't enforce NOT NULL automatically,
@@ -79,10 +144,144 @@ def init_db() -> sqlite3.Connection:
         )
     """)
     
+    # Index matching list_messages ordering (ts ASC, message_id ASC);
+    # also serves the since-only filter and keyset cursors
+    conn.execute("CREATE INDEX IF NOT EXISTS idx_messages_ts_id ON messages(ts, message_id)")
+    
+    # Index for the from filter (+ since + ordering) without a sort
+    conn.execute(
+        "CREATE INDEX IF NOT EXISTS idx_messages_from_ts ON messages(from_msisdn, ts, message_id)"
+    )
+    
+    # NOCASE index so prefix searches (`q=foo*`) become a range scan via
+    # SQLite's LIKE optimization (LIKE is case-insensitive by default)
+    conn.execute(
+        "CREATE INDEX IF NOT EXISTS idx_messages_text_nocase ON messages(text COLLATE NOCASE)"
+    )
+    
+    # Full-text index over messages.text for the `q` filter.
+    # External-content FTS5 table keyed by the messages rowid, kept in sync by triggers.
+    # The trigram tokenizer keeps the case-insensitive *substring* semantics of `q`.
+    fts_exists = conn.execute(
+        "SELECT 1 FROM sqlite_master WHERE type='table' AND name='messages_fts'"
+    ).fetchone() is not None
+    conn.execute("""
+        CREATE VIRTUAL TABLE IF NOT EXISTS messages_fts USING fts5(
+            text, content='messages', content_rowid='rowid', tokenize='trigram'
+        )
+    """)
+    conn.execute("""
+        CREATE TRIGGER IF NOT EXISTS messages_fts_ai AFTER INSERT ON messages BEGIN
+            INSERT INTO messages_fts(rowid, text) VALUES (new.rowid, new.text);
+        END
+    """)
+    conn.execute("""
+        CREATE TRIGGER IF NOT EXISTS messages_fts_ad AFTER DELETE ON messages BEGIN
+            INSERT INTO messages_fts(messages_fts, rowid, text) VALUES ('delete', old.rowid, old.text);
+        END
+    """)
+    conn.execute("""
+        CREATE TRIGGER IF NOT EXISTS messages_fts_au AFTER UPDATE ON messages BEGIN
+            INSERT INTO messages_fts(messages_fts, rowid, text) VALUES ('delete', old.rowid, old.text);
+            INSERT INTO messages_fts(rowid, text) VALUES (new.rowid, new.text);
+        END
+    """)
+    if not fts_exists:
+        # Index rows that existed before the FTS table was added
+        conn.execute("INSERT INTO messages_fts(messages_fts) VALUES ('rebuild')")
+    
+    _init_stats_tables(conn)
+    
     conn.commit()
     return conn
 
 
+def _init_stats_tables(conn: sqlite3.Connection):
+    """
+    Create the trigger-maintained aggregates behind /stats.
+    
+    - stats_summary: single row with total message count and first/last ts
+    - sender_counts: message count per sender (its row count is senders_count)
+    
+    Tables created for an existing database are backfilled from messages in the
+    same transaction that installs the triggers.
+    
+    Args:
+        conn: Database connection (autocommit mode)
+    """
+    conn.execute("BEGIN IMMEDIATE")
+    try:
+        summary_exists = conn.execute(
+            "SELECT 1 FROM sqlite_master WHERE type='table' AND name='stats_summary'"
+        ).fetchone() is not None
+        
+        conn.execute("""
+            CREATE TABLE IF NOT EXISTS stats_summary (
+                id INTEGER PRIMARY KEY CHECK (id = 1),
+                total INTEGER NOT NULL,
+                first_ts TEXT,
+                last_ts TEXT
+            )
+        """)
+        conn.execute("""
+            CREATE TABLE IF NOT EXISTS sender_counts (
+                from_msisdn TEXT PRIMARY KEY NOT NULL,
+                count INTEGER NOT NULL
+            )
+        """)
+        
+        conn.execute("""
+            CREATE TRIGGER IF NOT EXISTS messages_stats_ai AFTER INSERT ON messages BEGIN
+                UPDATE stats_summary SET
+                    total = total + 1,
+                    first_ts = CASE WHEN first_ts IS NULL OR NEW.ts < first_ts THEN NEW.ts ELSE first_ts END,
+                    last_ts = CASE WHEN last_ts IS NULL OR NEW.ts > last_ts THEN NEW.ts ELSE last_ts END
+                WHERE id = 1;
+                INSERT INTO sender_counts (from_msisdn, count) VALUES (NEW.from_msisdn, 1)
+                    ON CONFLICT(from_msisdn) DO UPDATE SET count = count + 1;
+            END
+        """)
+        # Deletes/updates are rare: first/last ts are re-read via idx_messages_ts_id
+        conn.execute("""
+            CREATE TRIGGER IF NOT EXISTS messages_stats_ad AFTER DELETE ON messages BEGIN
+                UPDATE stats_summary SET
+                    total = total - 1,
+                    first_ts = (SELECT MIN(ts) FROM messages),
+                    last_ts = (SELECT MAX(ts) FROM messages)
+                WHERE id = 1;
+                UPDATE sender_counts SET count = count - 1 WHERE from_msisdn = OLD.from_msisdn;
+                DELETE FROM sender_counts WHERE from_msisdn = OLD.from_msisdn AND count <= 0;
+            END
+        """)
+        conn.execute("""
+            CREATE TRIGGER IF NOT EXISTS messages_stats_au AFTER UPDATE OF from_msisdn, ts ON messages BEGIN
+                UPDATE stats_summary SET
+                    first_ts = (SELECT MIN(ts) FROM messages),
+                    last_ts = (SELECT MAX(ts) FROM messages)
+                WHERE id = 1;
+                UPDATE sender_counts SET count = count - 1 WHERE from_msisdn = OLD.from_msisdn;
+                DELETE FROM sender_counts WHERE from_msisdn = OLD.from_msisdn AND count <= 0;
+                INSERT INTO sender_counts (from_msisdn, count) VALUES (NEW.from_msisdn, 1)
+                    ON CONFLICT(from_msisdn) DO UPDATE SET count = count + 1;
+            END
+        """)
+        
+        if not summary_exists:
+            # Backfill aggregates for messages inserted before the tables existed
+            conn.execute("""
+                INSERT INTO stats_summary (id, total, first_ts, last_ts)
+                SELECT 1, COUNT(*), MIN(ts), MAX(ts) FROM messages
+            """)
+            conn.execute("""
+                INSERT INTO sender_counts (from_msisdn, count)
+                SELECT from_msisdn, COUNT(*) FROM messages GROUP BY from_msisdn
+            """)
+        conn.execute("COMMIT")
+    except Exception:
+        conn.execute("ROLLBACK")
+        raise
+
+
 def init_schema():
     """
     Initialize database schema on startup.
@@ -1,11 +1,50 @@
 """
 Health router.
 """
+import sqlite3
+from typing import Optional, Tuple
 from fastapi import APIRouter
 from fastapi.responses import JSONResponse
+from app.config import settings
+from app.models import parse_database_url, read_only_uri
 
 router = APIRouter()
 
+# Cached read-only connection used by readiness probes: (db_path, connection)
+_probe_conn: Optional[Tuple[str, sqlite3.Connection]] = None
+
+TABLE_EXISTS_SQL = "SELECT 1 FROM sqlite_master WHERE type='table' AND name='messages' LIMIT 1"
+
+
+def _get_probe_conn() -> sqlite3.Connection:
+    """
+    Get the cached read-only probe connection, opening it on first use.
+    Reopens if DATABASE_URL changed since the connection was created.
+    
+    Returns:
+        Read-only SQLite connection (never creates the database file)
+    """
+    global _probe_conn
+    db_path = parse_database_url(settings.DATABASE_URL)
+    if _probe_conn is not None:
+        cached_path, conn = _probe_conn
+        if cached_path == db_path:
+            return conn
+        _close_probe_conn()
+    
+    conn = sqlite3.connect(read_only_uri(db_path), uri=True, check_same_thread=False)
+    _probe_conn = (db_path, conn)
+    return conn
+
+
+def _close_probe_conn():
+    """Close and forget the cached probe connection."""
+    global _probe_conn
+    if _probe_conn is not None:
+        _probe_conn[1].close()
+        _probe_conn = None
+
+
 @router.get("/live")
 async def liveness():
     """Liveness probe endpoint - always returns 200."""
@@ -22,10 +61,6 @@ async def readiness():
     - WEBHOOK_SECRET is set
     Otherwise returns 503.
     """
-    from app.config import settings
-    from app.models import parse_database_url
-    import sqlite3
-    
     # Check if WEBHOOK_SECRET is configured
     if not settings.WEBHOOK_SECRET:
         return JSONResponse(
@@ -35,22 +70,11 @@ async def readiness():
     
     # Check database connection and messages table existence
     try:
-        # Connect to database without creating tables
-        db_path = parse_database_url(settings.DATABASE_URL)
-        conn = sqlite3.connect(db_path)
-        conn.row_factory = sqlite3.Row
-        
-        # Check if database is reachable
-        conn.execute("SELECT 1")
+        # Reuse the read-only probe connection (never creates tables)
+        conn = _get_probe_conn()
         
-        # Check if messages table exists (without creating it)
-        cursor = conn.execute("""
-            SELECT name FROM sqlite_master 
-            WHERE type='table' AND name='messages'
-        """)
-        table_exists = cursor.fetchone() is not None
-        
-        conn.close()
+        # Check if messages table exists (also proves the DB is reachable)
+        table_exists = conn.execute(TABLE_EXISTS_SQL).fetchone() is not None
         
         if not table_exists:
             return JSONResponse(
@@ -60,6 +84,14 @@ async def readiness():
         
         return {"status": "ready"}
         
+    except sqlite3.Error as e:
+        # Drop the cached connection so the next probe reconnects
+        _close_probe_conn()
+        return JSONResponse(
+            status_code=503,
+            content={"status": "not ready", "error": f"Database error: {str(e)}"}
+        )
+        
     except Exception as e:
         return JSONResponse(
             status_code=503,
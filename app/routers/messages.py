@@ -1,25 +1,70 @@
 """
 Messages router.
 """
-from fastapi import APIRouter, Query
-from app.storage import list_messages
-from typing import Optional
+from fastapi import APIRouter, HTTPException, Query
+from fastapi.responses import ORJSONResponse, StreamingResponse
+from app.config import settings
+from app.storage import MESSAGE_COLUMNS, count_messages, iter_messages, list_messages, list_messages_json
+from typing import Any, Dict, Iterator, Optional
+import orjson
 
 router = APIRouter()
 
+
+def ndjson_lines(
+    rows: Iterator[Dict[str, Any]],
+    limit: int,
+    offset: int,
+    has_more: bool,
+    next_cursor: Optional[str]
+) -> Iterator[bytes]:
+    """
+    Serialize a message stream as NDJSON.
+    The first line is a header describing the rows that follow, including
+    the pagination state (the page is fetched before streaming starts).
+    
+    Args:
+        rows: Message dictionaries
+        limit: Page size requested
+        offset: Offset requested
+        has_more: Whether more messages follow this page
+        next_cursor: Cursor for the following page, or None
+    
+    Yields:
+        One JSON document per line
+    """
+    yield orjson.dumps({
+        "fields": MESSAGE_COLUMNS,
+        "limit": limit,
+        "offset": offset,
+        "has_more": has_more,
+        "next_cursor": next_cursor
+    }) + b"\n"
+    for row in rows:
+        yield orjson.dumps(row) + b"\n"
+
+
 @router.get("")
 async def get_messages(
     limit: int = Query(50, ge=1, le=100, description="Number of messages to return (1-100)"),
     offset: int = Query(0, ge=0, description="Number of messages to skip"),
+    cursor: Optional[str] = Query(None, description="Opaque cursor from a previous page's next_cursor"),
     from_msisdn: Optional[str] = Query(None, alias="from", description="Filter by sender MSISDN"),
     since: Optional[str] = Query(None, description="Filter messages since ISO-8601 timestamp"),
-    q: Optional[str] = Query(None, description="Case-insensitive substring search on message text")
+    q: Optional[str] = Query(None, description="Case-insensitive substring search on message text"),
+    stream: bool = Query(False, description="Stream rows as NDJSON (application/x-ndjson) without a total"),
+    exact_count: bool = Query(False, description="Also count all matching messages (total)")
 ):
     """
     Get paginated and filtered messages.
     
     Returns messages ordered by ts ASC, message_id ASC.
-    Total count ignores limit/offset.
+    has_more tells whether another page follows. total (the count of all
+    matching messages, ignoring limit/offset/cursor) is only computed with
+    exact_count=true, since it visits every matching row; otherwise it is null.
+    Pass next_cursor back as cursor to fetch the next page without OFFSET scans.
+    With stream=true, rows are sent as NDJSON after a header line (which carries
+    has_more and next_cursor), each encoded as it is sent.
     """
     filters = {}
     if from_msisdn:
@@ -29,11 +74,38 @@ async def get_messages(
     if q:
         filters["q"] = q
     
-    rows, total = list_messages(filters=filters, limit=limit, offset=offset)
-    return {
-        "data": rows,
-        "total": total,
+    if stream:
+        try:
+            rows, has_more, next_cursor = iter_messages(
+                filters=filters, limit=limit, offset=offset, cursor=cursor
+            )
+        except ValueError as e:
+            raise HTTPException(status_code=400, detail=str(e))
+        return StreamingResponse(
+            ndjson_lines(rows, limit, offset, has_more, next_cursor),
+            media_type="application/x-ndjson"
+        )
+    
+    try:
+        if settings.FAST_ROWS:
+            rows_json, has_more, next_cursor = list_messages_json(
+                filters=filters, limit=limit, offset=offset, cursor=cursor
+            )
+            # Embed the SQLite-encoded rows as-is
+            data = orjson.Fragment(rows_json)
+        else:
+            data, has_more, next_cursor = list_messages(
+                filters=filters, limit=limit, offset=offset, cursor=cursor
+            )
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    # Returning a Response skips FastAPI's jsonable_encoder pass over every row;
+    # the plain dicts/str/int/None here are already orjson-serializable
+    return ORJSONResponse({
+        "data": data,
+        "total": count_messages(filters) if exact_count else None,
+        "has_more": has_more,
         "limit": limit,
-        "offset": offset
-    }
-
+        "offset": offset,
+        "next_cursor": next_cursor
+    })
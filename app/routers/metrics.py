@@ -7,8 +7,12 @@ from app.metrics import get_metrics
 
 router = APIRouter()
 
+# Prometheus text exposition format
+PROMETHEUS_CONTENT_TYPE = "text/plain; version=0.0.4"
+
 @router.get("/metrics", response_class=PlainTextResponse)
 async def metrics():
     """Prometheus-style metrics endpoint."""
-    return get_metrics()
+    # Metrics are rendered as bytes already, so no re-encoding is needed
+    return PlainTextResponse(get_metrics(), media_type=PROMETHEUS_CONTENT_TYPE)
 
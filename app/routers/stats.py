@@ -2,6 +2,7 @@
 Stats router.
 """
 from fastapi import APIRouter
+from fastapi.responses import ORJSONResponse
 from app.storage import compute_stats
 
 router = APIRouter()
@@ -10,5 +11,6 @@ router = APIRouter()
 async def get_stats():
     """Get statistics about messages."""
     stats = compute_stats()
-    return stats
+    # Serialize directly with orjson (skips jsonable_encoder)
+    return ORJSONResponse(stats)
 
@@ -3,45 +3,98 @@ Webhook router.
 """
 import hmac
 import hashlib
-from fastapi import APIRouter, Request, HTTPException, Body
-from fastapi.responses import JSONResponse
-from pydantic import BaseModel, Field, field_validator
+import msgspec
+from functools import lru_cache
+from msgspec.structs import force_setattr
+from fastapi import APIRouter, Request, HTTPException
 from datetime import datetime
-from typing import Optional
+from typing import Annotated, Optional
 from app.config import settings
-from app.storage import insert_message
-from app.logging_utils import log_webhook_event
+from app.storage import submit_message
+from app.logging_utils import log_webhook_event, setup_logging, utc_now_iso
 from app.metrics import record_webhook_request
 
 
 router = APIRouter()
+logger = setup_logging(settings.LOG_LEVEL)
 
 
-class WebhookPayload(BaseModel):
+def is_msisdn(value: str) -> bool:
+    """
+    Check for an E.164 phone number: '+' followed by 1-15 ASCII digits.
+    Checked with str methods instead of a regex match.
+    
+    Args:
+        value: Candidate phone number, e.g. +1234567890
+        
+    Returns:
+        True if value is a valid MSISDN, False otherwise
+    """
+    digits = value[1:]
+    return (
+        value[:1] == '+'
+        and 1 <= len(digits) <= 15
+        and digits.isascii()
+        and digits.isdigit()
+    )
+
+
+class WebhookPayload(msgspec.Struct, frozen=True):
     """Webhook payload model."""
-    message_id: str = Field(..., min_length=1)
-    from_msisdn: str = Field(..., alias="from", pattern=r'^\+\d{1,15}$')  
-    to_msisdn: str = Field(..., alias="to", pattern=r'^\+\d{1,15}$')  
-    ts: str = Field(...)  # ISO-8601 UTC with Z
-    text: Optional[str] = Field(None, max_length=4096)
-    
-    model_config = {"populate_by_name": True}  # Allow both field name and alias
-    
-    @field_validator('ts')
-    @classmethod
-    def validate_ts(cls, v: str) -> str:
-        """Validate ISO-8601 UTC timestamp with Z."""
+    message_id: Annotated[str, msgspec.Meta(min_length=1)]
+    ts: str  # ISO-8601 UTC with Z
+    text: Optional[Annotated[str, msgspec.Meta(max_length=4096)]] = None
+    
+    # Sender/recipient are accepted under their alias ("from"/"to") or field name
+    from_msisdn: Optional[str] = None
+    to_msisdn: Optional[str] = None
+    from_alias: Optional[str] = msgspec.field(default=None, name="from")
+    to_alias: Optional[str] = msgspec.field(default=None, name="to")
+    
+    def __post_init__(self):
+        """Resolve aliases, validate E.164 numbers and ISO-8601 UTC timestamp with Z."""
+        if self.from_msisdn is None:
+            if self.from_alias is None:
+                raise ValueError("Object missing required field `from`")
+            force_setattr(self, "from_msisdn", self.from_alias)
+        if self.to_msisdn is None:
+            if self.to_alias is None:
+                raise ValueError("Object missing required field `to`")
+            force_setattr(self, "to_msisdn", self.to_alias)
+        
+        if not is_msisdn(self.from_msisdn):
+            raise ValueError("Invalid E.164 MSISDN for `from`: expected '+' followed by 1-15 digits")
+        if not is_msisdn(self.to_msisdn):
+            raise ValueError("Invalid E.164 MSISDN for `to`: expected '+' followed by 1-15 digits")
+        
+        if not self.ts.endswith('Z'):
+            raise ValueError("Invalid ISO-8601 UTC timestamp: Timestamp must end with 'Z' (UTC)")
         try:
-            # Parse ISO-8601 with Z suffix
-            if not v.endswith('Z'):
-                raise ValueError("Timestamp must end with 'Z' (UTC)")
-            # Remove Z and parse
-            dt = datetime.fromisoformat(v.rstrip('Z'))
-            return v
+            datetime.fromisoformat(self.ts[:-1])
         except ValueError as e:
             raise ValueError(f"Invalid ISO-8601 UTC timestamp: {e}")
 
 
+# Decoder fusing JSON parsing and payload validation
+_payload_decoder = msgspec.json.Decoder(WebhookPayload)
+
+
+# Maximum accepted webhook body size (64 KiB)
+MAX_BODY_BYTES = 64 * 1024
+
+# Length of a hex-encoded SHA256 digest
+SIGNATURE_HEX_LENGTH = hashlib.sha256().digest_size * 2
+
+
+@lru_cache(maxsize=1)
+def _hmac_template(secret: str) -> "hmac.HMAC":
+    """
+    Build a keyed HMAC-SHA256 object for the secret once.
+    Per request the template is copied, skipping key encoding and ipad/opad setup.
+    """
+    return hmac.new(secret.encode('utf-8'), digestmod=hashlib.sha256)
+
+
 def verify_signature(body: bytes, signature: str, secret: str) -> bool:
     """
     Verify HMAC-SHA256 signature.
@@ -57,12 +110,14 @@ def verify_signature(body: bytes, signature: str, secret: str) -> bool:
     if not signature or not secret:
         return False
     
+    # Reject malformed signatures without hashing the body
+    if len(signature) != SIGNATURE_HEX_LENGTH:
+        return False
+    
     # Compute expected signature
-    expected_signature = hmac.new(
-        secret.encode('utf-8'),
-        body,
-        hashlib.sha256
-    ).hexdigest()
+    mac = _hmac_template(secret).copy()
+    mac.update(body)
+    expected_signature = mac.hexdigest()
     
     # Use constant-time comparison to prevent timing attacks
     return hmac.compare_digest(expected_signature, signature)
@@ -78,21 +133,47 @@ async def webhook(request: Request):
     # Get request ID from middleware
     request_id = getattr(request.state, 'request_id', 'unknown')
     
-    # Read raw request body bytes
-    body_bytes = await request.body()
-    
-    # Get signature from header
+    # Get signature from header and the secret (read once per request)
     signature = request.headers.get('X-Signature', '')
+    secret = settings.WEBHOOK_SECRET
     
-    # Validate signature
-    if not settings.WEBHOOK_SECRET:
+    # Cheap rejections before reading the body
+    if not secret:
         record_webhook_request('validation_error')
         raise HTTPException(
             status_code=401,
             detail="invalid signature"
         )
     
-    if not verify_signature(body_bytes, signature, settings.WEBHOOK_SECRET):
+    if not signature:
+        record_webhook_request('invalid_signature')
+        raise HTTPException(
+            status_code=401,
+            detail="invalid signature"
+        )
+    
+    try:
+        content_length = int(request.headers.get('content-length', 0))
+    except ValueError:
+        content_length = 0
+    if content_length > MAX_BODY_BYTES:
+        record_webhook_request('validation_error')
+        raise HTTPException(
+            status_code=413,
+            detail="payload too large"
+        )
+    
+    # Read raw request body bytes
+    body_bytes = await request.body()
+    if len(body_bytes) > MAX_BODY_BYTES:
+        record_webhook_request('validation_error')
+        raise HTTPException(
+            status_code=413,
+            detail="payload too large"
+        )
+    
+    # Validate signature
+    if not verify_signature(body_bytes, signature, secret):
         record_webhook_request('invalid_signature')
         raise HTTPException(
             status_code=401,
@@ -101,20 +182,18 @@ async def webhook(request: Request):
     
     # Parse and validate payload
     try:
-        import json
-        payload_dict = json.loads(body_bytes.decode('utf-8'))
-        payload = WebhookPayload(**payload_dict)
-    except json.JSONDecodeError:
+        payload = _payload_decoder.decode(body_bytes)
+    except msgspec.ValidationError as e:
         record_webhook_request('validation_error')
         raise HTTPException(
             status_code=400,
-            detail="invalid JSON"
+            detail=f"validation error: {str(e)}"
         )
-    except Exception as e:
+    except msgspec.DecodeError:
         record_webhook_request('validation_error')
         raise HTTPException(
             status_code=400,
-            detail=f"validation error: {str(e)}"
+            detail="invalid JSON"
         )
     
     # Prepare message data for storage
@@ -124,11 +203,11 @@ async def webhook(request: Request):
         "to_msisdn": payload.to_msisdn,
         "ts": payload.ts,
         "text": payload.text,
-        "created_at": datetime.utcnow().isoformat() + "Z"
+        "created_at": utc_now_iso()
     }
     
-    # Insert message idempotently
-    result = insert_message(message_data)
+    # Insert message idempotently (group-committed with concurrent webhooks)
+    result = await submit_message(message_data)
     
     # Determine if duplicate
     dup = (result == "duplicate")
@@ -137,8 +216,6 @@ async def webhook(request: Request):
     record_webhook_request(result)
     
     # Log webhook-specific fields
-    from app.logging_utils import setup_logging
-    logger = setup_logging(settings.LOG_LEVEL)
     log_webhook_event(
         logger=logger,
         request_id=request_id,
@@ -1,25 +1,220 @@
 """
 Database operations for message storage.
 """
+import asyncio
+import base64
+import binascii
+import os
+import queue
 import sqlite3
-from typing import Dict, Any, List, Tuple, Optional
-from app.models import init_db
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
+from operator import itemgetter
+from typing import Callable, Dict, Any, Iterator, List, Tuple, Optional
+from app.config import settings
+from app.models import connect_db, init_db, parse_database_url
 
 
-def get_db_connection() -> sqlite3.Connection:
+# Upper bound on pooled readers: each connection maps up to 1 GiB and caches
+# up to 256 MiB, and os.cpu_count() reports host cores inside containers
+MAX_READER_POOL_SIZE = 16
+
+
+def _usable_cpus() -> int:
+    """
+    Number of CPUs this process may run on.
+    
+    Returns:
+        CPU count from the scheduler affinity mask where available
+    """
+    if hasattr(os, "sched_getaffinity"):
+        return len(os.sched_getaffinity(0))
+    return os.cpu_count() or 1
+
+
+# Number of pooled read-only connections (WAL readers run concurrently):
+# one per usable CPU, at least 4 and at most MAX_READER_POOL_SIZE
+READER_POOL_SIZE = min(MAX_READER_POOL_SIZE, max(4, _usable_cpus()))
+
+# Insert statements kept as constants so every call hits the connection's
+# prepared-statement cache instead of re-parsing the SQL
+INSERT_MESSAGE_SQL = """
+    INSERT INTO messages (message_id, from_msisdn, to_msisdn, ts, text, created_at)
+    VALUES (?, ?, ?, ?, ?, ?)
+"""
+INSERT_MESSAGE_IGNORE_SQL = INSERT_MESSAGE_SQL + " ON CONFLICT(message_id) DO NOTHING"
+# Returns a row only when the message was actually inserted (SQLite >= 3.35)
+INSERT_MESSAGE_RETURNING_SQL = INSERT_MESSAGE_IGNORE_SQL + " RETURNING 1"
+
+# Batches at least this large refresh planner statistics (ANALYZE) afterwards
+ANALYZE_BATCH_THRESHOLD = 1000
+
+# Group commit for webhook writes: a batch closes at this many messages or
+# after lingering this long for more to arrive
+WRITE_BATCH_MAX_SIZE = 500
+WRITE_BATCH_MAX_WAIT_SECONDS = 0.005
+
+# How long a computed /stats result is served before it is recomputed
+STATS_CACHE_TTL_SECONDS = 1.0
+
+# Shortest `q` the trigram FTS index can answer; shorter terms fall back to LIKE
+FTS_MIN_QUERY_LENGTH = 3
+
+
+class ConnectionPool:
     """
-    Get a database connection.
+    Long-lived SQLite connections for one database file.
+    A single dedicated writer connection (serialized by a lock, avoiding
+    SQLITE_BUSY between our own writers) plus a queue of read-only (mode=ro)
+    reader connections, which WAL lets run alongside the writer.
+    """
+    
+    def __init__(self, db_path: str, readers: int = READER_POOL_SIZE):
+        self.db_path = db_path
+        # init_db creates the directory and schema if needed ("created on first use")
+        self.writer = init_db(self.db_path)
+        # Refresh planner statistics that are missing or stale (cheap when current)
+        self.writer.execute("PRAGMA optimize=0x10002")
+        self.writer_lock = threading.Lock()
+        self.readers: "queue.SimpleQueue[sqlite3.Connection]" = queue.SimpleQueue()
+        self._connections = [self.writer]
+        for _ in range(readers):
+            conn = connect_db(db_path, read_only=True)
+            self._connections.append(conn)
+            self.readers.put(conn)
+    
+    def close(self):
+        """Close every connection owned by the pool."""
+        # Let SQLite re-analyze whatever the queries since opening showed needs it;
+        # only the writer can store statistics
+        try:
+            self.writer.execute("PRAGMA optimize")
+        except sqlite3.Error:
+            pass
+        # Close the writer last: the final connection to close checkpoints the
+        # WAL into the main file, which read-only connections cannot do
+        for conn in reversed(self._connections):
+            conn.close()
+        self._connections = []
+
+
+# Pool for the current DATABASE_URL (created by init_pool or on first use)
+_POOL: Optional[ConnectionPool] = None
+_POOL_LOCK = threading.Lock()
+
+# Single thread that runs async-initiated writes, keeping them serialized and
+# off the event loop
+_WRITER_EXECUTOR = ThreadPoolExecutor(max_workers=1, thread_name_prefix="sqlite-writer")
+
+
+def _replace_pool(db_path: str) -> ConnectionPool:
+    """Close the current pool and open one for db_path (caller holds _POOL_LOCK)."""
+    global _POOL
+    if _POOL is not None:
+        _POOL.close()
+        _POOL = None
+    invalidate_stats_cache()
+    _POOL = ConnectionPool(db_path)
+    return _POOL
+
+
+def init_pool() -> ConnectionPool:
+    """
+    Open the connection pool for settings.DATABASE_URL.
+    Any previously opened pool is closed first.
     
     Returns:
-        SQLite database connection
+        The new connection pool
     """
-    return init_db()
+    with _POOL_LOCK:
+        return _replace_pool(parse_database_url(settings.DATABASE_URL))
+
+
+def close_pool():
+    """Close the connection pool (e.g. on shutdown or before deleting the DB file)."""
+    global _POOL
+    with _POOL_LOCK:
+        if _POOL is not None:
+            _POOL.close()
+            _POOL = None
+        invalidate_stats_cache()
+
+
+def _get_pool() -> ConnectionPool:
+    """Return the pool, (re)opening it if missing or if DATABASE_URL changed."""
+    db_path = parse_database_url(settings.DATABASE_URL)
+    pool = _POOL
+    if pool is not None and pool.db_path == db_path:
+        return pool
+    
+    # Re-check under the lock: another thread may have opened it meanwhile, and
+    # replacing that pool would close connections it is still using
+    with _POOL_LOCK:
+        if _POOL is not None and _POOL.db_path == db_path:
+            return _POOL
+        return _replace_pool(db_path)
+
+
+@contextmanager
+def get_reader() -> Iterator[sqlite3.Connection]:
+    """
+    Check out a pooled read-only connection.
+    Never blocks: if every pooled reader is in use, a temporary read-only
+    connection is opened and closed on exit.
+    
+    Yields:
+        SQLite database connection, returned to the pool on exit
+    """
+    pool = _get_pool()
+    try:
+        conn = pool.readers.get_nowait()
+        pooled = True
+    except queue.Empty:
+        # Pool exhausted: never wait (callers may be on the event loop), use a
+        # short-lived connection instead
+        conn = connect_db(pool.db_path, read_only=True)
+        pooled = False
+    try:
+        yield conn
+    finally:
+        if pooled:
+            pool.readers.put(conn)
+        else:
+            conn.close()
+
+
+@contextmanager
+def get_writer() -> Iterator[sqlite3.Connection]:
+    """
+    Acquire the dedicated writer connection.
+    
+    Yields:
+        SQLite database connection, held exclusively until exit
+    """
+    pool = _get_pool()
+    with pool.writer_lock:
+        yield pool.writer
+
+
+def _message_params(data: Dict[str, Any]) -> Tuple[Any, ...]:
+    """Build INSERT_MESSAGE_SQL parameters from a message dictionary."""
+    return (
+        data["message_id"],
+        data["from_msisdn"],
+        data["to_msisdn"],
+        data["ts"],
+        data.get("text"),
+        data["created_at"]
+    )
 
 
 def insert_message(data: Dict[str, Any]) -> str:
     """
     Insert a message into the database.
-    Idempotent via PRIMARY KEY message_id.
+    Idempotent via PRIMARY KEY message_id: a duplicate is skipped by
+    ON CONFLICT DO NOTHING rather than raised as an IntegrityError.
     
     Args:
         data: Dictionary containing message data with keys:
@@ -33,38 +228,466 @@ def insert_message(data: Dict[str, Any]) -> str:
     Returns:
         "created" if message was inserted, "duplicate" if message_id already exists
     """
-    conn = get_db_connection()
-    try:
-        conn.execute("""
-            INSERT INTO messages (message_id, from_msisdn, to_msisdn, ts, text, created_at)
-            VALUES (?, ?, ?, ?, ?, ?)
-        """, (
-            data["message_id"],
-            data["from_msisdn"],
-            data["to_msisdn"],
-            data["ts"],
-            data.get("text"),
-            data["created_at"]
-        ))
-        conn.commit()
-        conn.close()
-        return "created"
-    except sqlite3.IntegrityError:
-        # Duplicate message_id - idempotency handled via PRIMARY KEY
-        conn.rollback()
-        conn.close()
+    with get_writer() as conn:
+        inserted = conn.execute(INSERT_MESSAGE_RETURNING_SQL, _message_params(data)).fetchone()
+    if inserted is None:
         return "duplicate"
-    except Exception:
-        # Ensure connection is closed even on unexpected errors
-        conn.close()
-        raise
+    invalidate_stats_cache()
+    return "created"
+
+
+def insert_messages(messages: List[Dict[str, Any]]) -> int:
+    """
+    Insert many messages in a single transaction (one WAL commit for the batch).
+    Duplicates are skipped, so one existing message_id doesn't abort the batch.
+    
+    Args:
+        messages: List of message dictionaries (same keys as insert_message)
+    
+    Returns:
+        Number of messages actually inserted
+    """
+    with get_writer() as conn:
+        conn.execute("BEGIN")
+        try:
+            cursor = conn.executemany(INSERT_MESSAGE_IGNORE_SQL, map(_message_params, messages))
+            conn.execute("COMMIT")
+        except Exception:
+            conn.execute("ROLLBACK")
+            raise
+        invalidate_stats_cache()
+        
+        # Keep index statistics current after bulk loads so the planner
+        # keeps choosing the filter indexes
+        if cursor.rowcount >= ANALYZE_BATCH_THRESHOLD:
+            conn.execute("ANALYZE")
+        return cursor.rowcount
+
+
+def _insert_batch(messages: List[Dict[str, Any]]) -> List[str]:
+    """
+    Insert messages under one write transaction, reporting each one's outcome.
+    
+    Args:
+        messages: List of message dictionaries (same keys as insert_message)
+    
+    Returns:
+        "created" or "duplicate" for each message, in order
+    """
+    results = []
+    with get_writer() as conn:
+        # IMMEDIATE takes the write lock up front instead of upgrading mid-batch
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            for data in messages:
+                cursor = conn.execute(INSERT_MESSAGE_IGNORE_SQL, _message_params(data))
+                results.append("created" if cursor.rowcount == 1 else "duplicate")
+            conn.execute("COMMIT")
+        except Exception:
+            conn.execute("ROLLBACK")
+            raise
+    if "created" in results:
+        invalidate_stats_cache()
+    return results
+
+
+class WriteBatcher:
+    """
+    Coalesces concurrent message inserts into group commits.
+    Callers await submit(); a background task drains the queue and writes up to
+    WRITE_BATCH_MAX_SIZE messages per transaction (one WAL commit per batch).
+    """
+    
+    def __init__(
+        self,
+        max_size: int = WRITE_BATCH_MAX_SIZE,
+        max_wait: float = WRITE_BATCH_MAX_WAIT_SECONDS
+    ):
+        self.max_size = max_size
+        self.max_wait = max_wait
+        self.queue: "asyncio.Queue[Optional[Tuple[Dict[str, Any], asyncio.Future]]]" = asyncio.Queue()
+        self.task: Optional[asyncio.Task] = None
+    
+    def start(self):
+        """Start the background writer task on the running event loop."""
+        self.task = asyncio.create_task(self._run())
+    
+    async def stop(self):
+        """Write everything already queued, then stop the writer task."""
+        if self.task is None:
+            return
+        await self.queue.put(None)
+        await self.task
+        self.task = None
+    
+    async def submit(self, data: Dict[str, Any]) -> str:
+        """
+        Queue a message and wait for the batch holding it to commit.
+        
+        Args:
+            data: Message dictionary (same keys as insert_message)
+        
+        Returns:
+            "created" if message was inserted, "duplicate" if message_id already exists
+        """
+        future = asyncio.get_running_loop().create_future()
+        await self.queue.put((data, future))
+        return await future
+    
+    def _drain(self, batch: List[Tuple[Dict[str, Any], asyncio.Future]]) -> bool:
+        """Move queued items into batch; returns False once the stop sentinel is seen."""
+        while len(batch) < self.max_size:
+            try:
+                item = self.queue.get_nowait()
+            except asyncio.QueueEmpty:
+                return True
+            if item is None:
+                return False
+            batch.append(item)
+        return True
+    
+    async def _run(self):
+        running = True
+        while running:
+            item = await self.queue.get()
+            if item is None:
+                break
+            batch = [item]
+            running = self._drain(batch)
+            if running and len(batch) < self.max_size:
+                # Linger briefly so concurrent requests share the commit
+                await asyncio.sleep(self.max_wait)
+                running = self._drain(batch)
+            
+            # Run the blocking SQLite work on the writer thread
+            try:
+                results = await asyncio.get_running_loop().run_in_executor(
+                    _WRITER_EXECUTOR, _insert_batch, [data for data, _ in batch]
+                )
+            except Exception as e:
+                for _, future in batch:
+                    if not future.done():
+                        future.set_exception(e)
+            else:
+                for (_, future), result in zip(batch, results):
+                    if not future.done():
+                        future.set_result(result)
+
+
+# Batcher started by start_write_batcher (None when writes go straight to SQLite)
+_BATCHER: Optional[WriteBatcher] = None
+
+
+def start_write_batcher() -> WriteBatcher:
+    """
+    Start group-committing submit_message writes (call from the event loop).
+    
+    Returns:
+        The running write batcher
+    """
+    global _BATCHER
+    _BATCHER = WriteBatcher()
+    _BATCHER.start()
+    return _BATCHER
+
+
+async def stop_write_batcher():
+    """Flush queued writes and stop the write batcher."""
+    global _BATCHER
+    if _BATCHER is not None:
+        batcher, _BATCHER = _BATCHER, None
+        await batcher.stop()
+
+
+async def submit_message(data: Dict[str, Any]) -> str:
+    """
+    Insert a message idempotently, batched with concurrent writes when the
+    write batcher is running and inserted directly (on the writer thread) otherwise.
+    
+    Args:
+        data: Message dictionary (same keys as insert_message)
+    
+    Returns:
+        "created" if message was inserted, "duplicate" if message_id already exists
+    """
+    if _BATCHER is None:
+        return await asyncio.get_running_loop().run_in_executor(_WRITER_EXECUTOR, insert_message, data)
+    return await _BATCHER.submit(data)
+
+
+def like_escape(term: str) -> str:
+    """
+    Escape LIKE wildcards in a user search term (for use with ESCAPE '\\').
+    
+    Args:
+        term: Raw search term
+    
+    Returns:
+        Term with \\, % and _ escaped
+    """
+    return term.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_")
+
+
+def fts_phrase(term: str) -> str:
+    """
+    Quote a user search term as an FTS5 phrase so operators in it are literal.
+    
+    Args:
+        term: Raw search term
+        
+    Returns:
+        FTS5 MATCH expression matching the term as a substring
+    """
+    return '"' + term.replace('"', '""') + '"'
+
+
+def encode_cursor(ts: str, message_id: str) -> str:
+    """
+    Encode a keyset pagination cursor for the (ts, message_id) sort key.
+    
+    Args:
+        ts: Timestamp of the last returned message
+        message_id: Message ID of the last returned message
+        
+    Returns:
+        Opaque URL-safe cursor string
+    """
+    return base64.urlsafe_b64encode(f"{ts}|{message_id}".encode("utf-8")).decode("ascii")
+
+
+def decode_cursor(cursor: str) -> Tuple[str, str]:
+    """
+    Decode a cursor produced by encode_cursor.
+    
+    Args:
+        cursor: Opaque cursor string
+        
+    Returns:
+        Tuple of (ts, message_id)
+        
+    Raises:
+        ValueError: If the cursor is malformed
+    """
+    try:
+        decoded = base64.urlsafe_b64decode(cursor.encode("ascii")).decode("utf-8")
+    except (binascii.Error, UnicodeError) as e:
+        raise ValueError(f"invalid cursor: {e}")
+    ts, sep, message_id = decoded.partition("|")
+    if not sep:
+        raise ValueError("invalid cursor")
+    return ts, message_id
+
+
+# Columns returned for each message, in response order
+MESSAGE_COLUMNS = ("message_id", "from_msisdn", "to_msisdn", "ts", "text", "created_at")
+
+# Filter flags; a bitmask of these selects one of the pre-built SQL variants
+FILTER_FROM = 1
+FILTER_SINCE = 2
+FILTER_Q_FTS = 4
+FILTER_Q_LIKE = 8
+FILTER_AFTER = 16
+
+# WHERE condition per flag, in the order their parameters are bound
+_FILTER_CONDITIONS = (
+    (FILTER_FROM, "from_msisdn = ?"),
+    (FILTER_SINCE, "ts >= ?"),
+    (FILTER_Q_FTS, "rowid IN (SELECT rowid FROM messages_fts WHERE messages_fts MATCH ?)"),
+    (FILTER_Q_LIKE, "text LIKE ? ESCAPE '\\'"),
+    # Seek past the cursor (not part of the total count); the row-value form
+    # lets SQLite seek the (ts, message_id) indexes, an OR expansion would scan
+    (FILTER_AFTER, "(ts, message_id) > (?, ?)"),
+)
+
+
+def _where_clause(mask: int) -> str:
+    """Build the WHERE clause for a filter bitmask."""
+    conditions = [sql for flag, sql in _FILTER_CONDITIONS if mask & flag]
+    return " WHERE " + " AND ".join(conditions) if conditions else ""
+
+
+# Each message rendered as a JSON object by SQLite itself (FAST_ROWS path)
+_MESSAGE_JSON_COLUMN = "json_object(" + ", ".join(f"'{c}', {c}" for c in MESSAGE_COLUMNS) + ")"
+
+
+def _list_sql(columns: str, mask: int) -> str:
+    """Build the ordered, paginated SELECT of columns for a filter bitmask."""
+    return f"""
+        SELECT {columns}
+        FROM messages{_where_clause(mask)}
+        ORDER BY ts ASC, message_id ASC
+        LIMIT ? OFFSET ?
+    """
+
+
+# Every SQL variant is built once at import, so a given filter combination
+# always sends identical text and reuses the connection's prepared statement
+_COUNT_SQL: Dict[int, str] = {
+    mask: f"SELECT COUNT(*) as total FROM messages{_where_clause(mask)}"
+    for mask in range(FILTER_AFTER)
+}
+_LIST_SQL: Dict[int, str] = {
+    mask: _list_sql(", ".join(MESSAGE_COLUMNS), mask)
+    for mask in range(FILTER_AFTER * 2)
+}
+_LIST_JSON_SQL: Dict[int, str] = {
+    mask: _list_sql(f"{_MESSAGE_JSON_COLUMN}, ts, message_id", mask)
+    for mask in range(FILTER_AFTER * 2)
+}
+
+
+def _filter_params(filters: Optional[Dict[str, Any]]) -> Tuple[int, List[Any]]:
+    """
+    Pick the filter variant and bind parameters for list filters.
+    
+    Args:
+        filters: Filter dictionary (see list_messages)
+    
+    Returns:
+        Tuple of (filter bitmask, params)
+    """
+    mask = 0
+    params = []
+    
+    if filters:
+        if "from_msisdn" in filters and filters["from_msisdn"]:
+            mask |= FILTER_FROM
+            params.append(filters["from_msisdn"])
+    
+        if "since" in filters and filters["since"]:
+            mask |= FILTER_SINCE
+            params.append(filters["since"])
+    
+        if "q" in filters and filters["q"]:
+            q = filters["q"]
+            if len(q) > 1 and q.endswith("*"):
+                # Prefix search: range scan on idx_messages_text_nocase
+                mask |= FILTER_Q_LIKE
+                params.append(f"{like_escape(q[:-1])}%")
+            elif len(q) >= FTS_MIN_QUERY_LENGTH:
+                # Trigram FTS index lookup instead of a full scan
+                mask |= FILTER_Q_FTS
+                params.append(fts_phrase(q))
+            else:
+                # Too short for trigrams: fall back to a scan (LIKE is
+                # already ASCII case-insensitive, like LOWER() was, so no
+                # per-row LOWER(); non-ASCII case is not folded here)
+                mask |= FILTER_Q_LIKE
+                params.append(f"%{like_escape(q)}%")
+    
+    return mask, params
+
+
+def _page_query(
+    mask: int,
+    params: List[Any],
+    limit: int,
+    offset: int,
+    after: Optional[Tuple[str, str]],
+    variants: Dict[int, str] = _LIST_SQL
+) -> Tuple[str, List[Any]]:
+    """
+    Pick the ordered, paginated SELECT for a filter variant.
+    
+    Args:
+        mask: Filter bitmask from _filter_params
+        params: Parameters for the filters
+        limit: Maximum number of rows to return
+        offset: Number of rows to skip
+        after: Decoded keyset cursor, or None
+        variants: Pre-built SELECTs to pick from (_LIST_SQL or _LIST_JSON_SQL)
+    
+    Returns:
+        Tuple of (query, params)
+    """
+    params = list(params)
+    if after:
+        mask |= FILTER_AFTER
+        params.extend(after)
+    params.extend([limit, offset])
+    return variants[mask], params
+
+
+def _message_cursor(conn: sqlite3.Connection, query: str, params: List[Any]) -> sqlite3.Cursor:
+    """
+    Execute a message SELECT returning plain tuples (in MESSAGE_COLUMNS order
+    for _LIST_SQL variants).
+    Skips the connection's sqlite3.Row factory; callers build each response
+    dict once with dict(zip(MESSAGE_COLUMNS, row)) instead of per-key lookups.
+    """
+    cursor = conn.cursor()
+    cursor.row_factory = None
+    return cursor.execute(query, params)
+
+
+def count_messages(filters: Optional[Dict[str, Any]] = None) -> int:
+    """
+    Count all messages matching filters (ignores pagination).
+    Visits every matching row, so /messages only runs it on request.
+    
+    Args:
+        filters: Filter dictionary (see list_messages)
+    
+    Returns:
+        Total number of messages matching filters
+    """
+    mask, params = _filter_params(filters)
+    with get_reader() as conn:
+        return conn.execute(_COUNT_SQL[mask], params).fetchone()["total"]
+
+
+def _fetch_page(
+    filters: Optional[Dict[str, Any]],
+    limit: int,
+    offset: int,
+    cursor: Optional[str],
+    variants: Dict[int, str],
+    cursor_key: Callable[[Tuple[Any, ...]], Tuple[str, str]]
+) -> Tuple[List[Tuple[Any, ...]], bool, Optional[str]]:
+    """
+    Fetch one page of raw rows plus its pagination state.
+    One extra row is fetched to learn whether another page exists (no COUNT).
+    
+    Args:
+        filters: Filter dictionary (see list_messages)
+        limit: Maximum number of rows to return
+        offset: Number of rows to skip
+        cursor: Keyset cursor from a previous page
+        variants: Pre-built SELECTs to pick from (_LIST_SQL or _LIST_JSON_SQL)
+        cursor_key: Extracts (ts, message_id) from a row of that SELECT
+    
+    Returns:
+        Tuple of (rows, has_more, next_cursor)
+        
+    Raises:
+        ValueError: If cursor is malformed
+    """
+    after = decode_cursor(cursor) if cursor else None
+    mask, params = _filter_params(filters)
+    query, params = _page_query(mask, params, limit + 1, offset, after, variants)
+    
+    with get_reader() as conn:
+        rows = _message_cursor(conn, query, params).fetchall()
+    
+    has_more = len(rows) > limit
+    next_cursor = None
+    if has_more:
+        del rows[limit:]
+        next_cursor = encode_cursor(*cursor_key(rows[-1]))
+    return rows, has_more, next_cursor
+
+
+# (ts, message_id) of a _LIST_SQL row (MESSAGE_COLUMNS order) / _LIST_JSON_SQL row
+_LIST_CURSOR_KEY = itemgetter(MESSAGE_COLUMNS.index("ts"), MESSAGE_COLUMNS.index("message_id"))
+_LIST_JSON_CURSOR_KEY = itemgetter(1, 2)
 
 
 def list_messages(
     filters: Optional[Dict[str, Any]] = None,
     limit: int = 20,
-    offset: int = 0
-) -> Tuple[List[Dict[str, Any]], int]:
+    offset: int = 0,
+    cursor: Optional[str] = None
+) -> Tuple[List[Dict[str, Any]], bool, Optional[str]]:
     """
     List messages with filtering, pagination, and ordering.
     
@@ -72,72 +695,118 @@ def list_messages(
         filters: Dictionary with optional filter keys:
             - from_msisdn: Filter by sender phone number
             - since: Filter messages where ts >= since (timestamp string)
-            - q: Case-insensitive text search in message text
+            - q: Case-insensitive text search in message text; a trailing
+              `*` searches for messages starting with the term instead.
+              Terms of FTS_MIN_QUERY_LENGTH+ characters fold Unicode case
+              (trigram index); shorter and prefix terms use LIKE, which
+              folds ASCII only
         limit: Maximum number of rows to return
         offset: Number of rows to skip
+        cursor: Keyset cursor from a previous page; only rows after it are
+            returned (seeks via the (ts, message_id) index instead of skipping rows)
     
     Returns:
-        Tuple of (rows, total_count) where:
+        Tuple of (rows, has_more, next_cursor) where:
         - rows: List of message dictionaries
-        - total_count: Total number of messages matching filters
+        - has_more: Whether more messages follow this page
+        - next_cursor: Cursor for the following page, or None if there is none
+        
+    Raises:
+        ValueError: If cursor is malformed
     """
-    conn = get_db_connection()
+    rows, has_more, next_cursor = _fetch_page(
+        filters, limit, offset, cursor, _LIST_SQL, _LIST_CURSOR_KEY
+    )
     
-    # Build WHERE clause
-    conditions = []
-    params = []
+    # Build response dicts straight from the tuples (one C-level dict per row)
+    result_rows = [dict(zip(MESSAGE_COLUMNS, row)) for row in rows]
     
-    if filters:
-        if "from_msisdn" in filters and filters["from_msisdn"]:
-            conditions.append("from_msisdn = ?")
-            params.append(filters["from_msisdn"])
-        
-        if "since" in filters and filters["since"]:
-            conditions.append("ts >= ?")
-            params.append(filters["since"])
-        
-        if "q" in filters and filters["q"]:
-            conditions.append("LOWER(text) LIKE ?")
-            params.append(f"%{filters['q'].lower()}%")
+    return (result_rows, has_more, next_cursor)
+
+
+def list_messages_json(
+    filters: Optional[Dict[str, Any]] = None,
+    limit: int = 20,
+    offset: int = 0,
+    cursor: Optional[str] = None
+) -> Tuple[str, bool, Optional[str]]:
+    """
+    Like list_messages, but the page comes back as an encoded JSON array.
+    SQLite renders each row with json_object(), so no per-row Python dict is
+    built; used by /messages when settings.FAST_ROWS is enabled.
     
-    where_clause = " WHERE " + " AND ".join(conditions) if conditions else ""
+    Args:
+        filters: Filter dictionary (see list_messages)
+        limit: Maximum number of rows to return
+        offset: Number of rows to skip
+        cursor: Keyset cursor from a previous page
     
-    # Get total count
-    count_query = f"SELECT COUNT(*) as total FROM messages{where_clause}"
-    total = conn.execute(count_query, params).fetchone()["total"]
+    Returns:
+        Tuple of (rows_json, has_more, next_cursor)
+        
+    Raises:
+        ValueError: If cursor is malformed
+    """
+    rows, has_more, next_cursor = _fetch_page(
+        filters, limit, offset, cursor, _LIST_JSON_SQL, _LIST_JSON_CURSOR_KEY
+    )
     
-    # Get paginated results with ordering: ts ASC, message_id ASC
-    query = f"""
-        SELECT message_id, from_msisdn, to_msisdn, ts, text, created_at
-        FROM messages
-        {where_clause}
-        ORDER BY ts ASC, message_id ASC
-        LIMIT ? OFFSET ?
+    rows_json = "[" + ",".join([row[0] for row in rows]) + "]"
+    return (rows_json, has_more, next_cursor)
+
+
+def iter_messages(
+    filters: Optional[Dict[str, Any]] = None,
+    limit: int = 20,
+    offset: int = 0,
+    cursor: Optional[str] = None
+) -> Tuple[Iterator[Dict[str, Any]], bool, Optional[str]]:
     """
-    params.extend([limit, offset])
+    Iterate messages one row at a time, for streaming responses.
+    Same filtering, ordering and pagination as list_messages.
     
-    rows = conn.execute(query, params).fetchall()
-    
-    # Convert rows to dictionaries
-    result_rows = [
-        {
-            "message_id": row["message_id"],
-            "from_msisdn": row["from_msisdn"],
-            "to_msisdn": row["to_msisdn"],
-            "ts": row["ts"],
-            "text": row["text"],
-            "created_at": row["created_at"]
-        }
-        for row in rows
-    ]
+    The page (at most `limit` rows) is fetched up front and the reader
+    connection returned to the pool before this returns, so a slow client
+    never holds a pooled connection across yields; only the per-row dicts
+    and their serialization are deferred.
+    
+    Args:
+        filters: Filter dictionary (see list_messages)
+        limit: Maximum number of rows to yield
+        offset: Number of rows to skip
+        cursor: Keyset cursor from a previous page
+    
+    Returns:
+        Tuple of (rows, has_more, next_cursor) where rows is an iterator of
+        message dictionaries
+        
+    Raises:
+        ValueError: If cursor is malformed
+    """
+    rows, has_more, next_cursor = _fetch_page(
+        filters, limit, offset, cursor, _LIST_SQL, _LIST_CURSOR_KEY
+    )
     
-    conn.close()
-    return (result_rows, total)
+    return ((dict(zip(MESSAGE_COLUMNS, row)) for row in rows), has_more, next_cursor)
+
+
+# Last compute_stats result; "generation" is bumped by every invalidation so a
+# result computed concurrently with a write is not cached
+_STATS_CACHE: Dict[str, Any] = {"value": None, "expires": 0.0, "generation": 0}
+_STATS_LOCK = threading.Lock()
+
+
+def invalidate_stats_cache():
+    """Force the next compute_stats call to re-read the database (after writes)."""
+    _STATS_CACHE["generation"] += 1
+    _STATS_CACHE["expires"] = 0.0
 
 
 def compute_stats() -> Dict[str, Any]:
     """
     Compute aggregated statistics about messages.
+    Results are cached for STATS_CACHE_TTL_SECONDS and invalidated by inserts;
+    concurrent misses wait on one database read instead of each running it.
     
     Returns:
         Dictionary with aggregated statistics including:
@@ -147,46 +816,63 @@ def compute_stats() -> Dict[str, Any]:
         - first_message_ts
         - last_message_ts
     """
-    conn = get_db_connection()
-    
-    # Total messages
-    total = conn.execute("SELECT COUNT(*) as total FROM messages").fetchone()["total"]
-    
-    # Unique senders count
-    senders_count = conn.execute(
-        "SELECT COUNT(DISTINCT from_msisdn) as count FROM messages"
-    ).fetchone()["count"]
+    with _STATS_LOCK:
+        if time.monotonic() < _STATS_CACHE["expires"]:
+            return _STATS_CACHE["value"]
+        
+        generation = _STATS_CACHE["generation"]
+        stats = _read_stats()
+        if generation == _STATS_CACHE["generation"]:
+            _STATS_CACHE["value"] = stats
+            _STATS_CACHE["expires"] = time.monotonic() + STATS_CACHE_TTL_SECONDS
+        return stats
+
+
+def _read_stats() -> Dict[str, Any]:
+    """
+    Read /stats aggregates from the database.
+    Uses the stats_summary/sender_counts tables maintained by triggers on
+    messages, so the cost doesn't grow with the number of messages.
     
-    # Messages per sender (top 10, sorted desc)
-    messages_per_sender = conn.execute("""
-        SELECT from_msisdn, COUNT(*) as count
-        FROM messages
-        GROUP BY from_msisdn
-        ORDER BY count DESC
-        LIMIT 10
-    """).fetchall()
+    Returns:
+        Dictionary with the keys described in compute_stats
+    """
+    with get_reader() as conn:
+        # One read transaction so all three queries see the same snapshot
+        # (in autocommit each would see its own, and a concurrent write could
+        # make the totals disagree)
+        conn.execute("BEGIN")
+        try:
+            # Total and first/last timestamps from the trigger-maintained summary row
+            summary = conn.execute(
+                "SELECT total, first_ts, last_ts FROM stats_summary WHERE id = 1"
+            ).fetchone()
+            
+            # One row per sender in sender_counts
+            senders_count = conn.execute(
+                "SELECT COUNT(*) as count FROM sender_counts"
+            ).fetchone()["count"]
+            
+            # Messages per sender (top 10, sorted desc)
+            messages_per_sender = conn.execute("""
+                SELECT from_msisdn, count
+                FROM sender_counts
+                ORDER BY count DESC
+                LIMIT 10
+            """).fetchall()
+        finally:
+            conn.execute("COMMIT")
     
     messages_per_sender_list = [
         {"from_msisdn": row["from_msisdn"], "count": row["count"]}
         for row in messages_per_sender
     ]
     
-    # First and last message timestamps
-    first_last = conn.execute("""
-        SELECT MIN(ts) as first_ts, MAX(ts) as last_ts
-        FROM messages
-    """).fetchone()
-    
-    first_message_ts = first_last["first_ts"] if first_last["first_ts"] else None
-    last_message_ts = first_last["last_ts"] if first_last["last_ts"] else None
-    
-    conn.close()
-    
     return {
-        "total_messages": total,
+        "total_messages": summary["total"],
         "senders_count": senders_count,
         "messages_per_sender": messages_per_sender_list,
-        "first_message_ts": first_message_ts,
-        "last_message_ts": last_message_ts
+        "first_message_ts": summary["first_ts"] or None,
+        "last_message_ts": summary["last_ts"] or None
     }
 
@@ -0,0 +1,22 @@
+"""
+Shared test fixtures.
+"""
+import pytest
+from app.config import settings
+from app.models import init_db
+
+
+@pytest.fixture(scope="session")
+def template_db(tmp_path_factory):
+    """
+    Database file with the full schema, created once per test session.
+    Tests copy it (shutil.copyfile) instead of running init_schema each time.
+    """
+    path = tmp_path_factory.mktemp("template") / "template.db"
+    with pytest.MonkeyPatch.context() as mp:
+        mp.setattr(settings, "DATABASE_URL", f"sqlite:///{path}")
+        conn = init_db()
+        # Closing the only connection checkpoints the WAL into the main file,
+        # so copying that file alone is enough
+        conn.close()
+    return path
@@ -0,0 +1,82 @@
+"""
+Tests for CORS:
+- Browser-facing paths answer preflights from allowed origins
+- Server-to-server paths and unlisted origins get no CORS headers
+"""
+import pytest
+import tempfile
+import shutil
+import os
+from fastapi.testclient import TestClient
+from app.main import app
+from app.config import settings
+from app.storage import close_pool
+
+ALLOWED_ORIGIN = "http://localhost:3000"
+
+
+@pytest.fixture
+def client():
+    """Create test client."""
+    return TestClient(app)
+
+
+@pytest.fixture(autouse=True)
+def setup_test_db(monkeypatch, template_db):
+    """Set up test database before each test."""
+    test_db_path = os.path.join(tempfile.gettempdir(), f'test_cors_{os.getpid()}.db')
+    if os.path.exists(test_db_path):
+        os.unlink(test_db_path)
+    
+    monkeypatch.setattr(settings, "DATABASE_URL", f"sqlite:///{test_db_path}")
+    monkeypatch.setattr(settings, "WEBHOOK_SECRET", "test-secret-key")
+    shutil.copyfile(template_db, test_db_path)
+    
+    yield
+    
+    # Cleanup (release pooled connections before deleting the file)
+    close_pool()
+    if os.path.exists(test_db_path):
+        os.unlink(test_db_path)
+
+
+def preflight(client, path, origin=ALLOWED_ORIGIN):
+    """Send a CORS preflight for a GET to path."""
+    return client.options(path, headers={
+        "Origin": origin,
+        "Access-Control-Request-Method": "GET",
+    })
+
+
+def test_preflight_allowed_origin(client):
+    """Test a preflight to /messages from an allowed origin is answered."""
+    assert ALLOWED_ORIGIN in settings.CORS_ORIGINS
+    response = preflight(client, "/messages")
+    assert response.status_code == 200
+    assert response.headers["access-control-allow-origin"] == ALLOWED_ORIGIN
+    
+    response = client.get("/messages", headers={"Origin": ALLOWED_ORIGIN})
+    assert response.status_code == 200
+    assert response.headers["access-control-allow-origin"] == ALLOWED_ORIGIN
+
+
+def test_no_cors_on_server_paths(client):
+    """Test health probes and lookalike paths bypass CORS."""
+    for path in ("/health/ready", "/messagesfoo"):
+        assert "access-control-allow-origin" not in preflight(client, path).headers
+    
+    response = client.get("/health/ready", headers={"Origin": ALLOWED_ORIGIN})
+    assert response.status_code == 200
+    assert "access-control-allow-origin" not in response.headers
+
+
+def test_no_cors_for_unlisted_origin(client):
+    """Test origins outside CORS_ORIGINS get no allow-origin header."""
+    origin = "http://evil.example"
+    assert origin not in settings.CORS_ORIGINS
+    response = preflight(client, "/messages", origin=origin)
+    assert response.status_code == 400
+    assert "access-control-allow-origin" not in response.headers
+    
+    response = client.get("/messages", headers={"Origin": origin})
+    assert "access-control-allow-origin" not in response.headers
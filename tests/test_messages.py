@@ -3,14 +3,19 @@ Tests for /messages endpoint:
 - Pagination
 - Filtering (by from_number, to_number, date range)
 """
+import json
+import sqlite3
 import pytest
 import tempfile
+import shutil
 import os
 from fastapi.testclient import TestClient
 from app.main import app
 from app.config import settings
-from app.models import init_schema
-from app.storage import insert_message
+from app.models import parse_database_url
+from app.routers.messages import ndjson_lines
+from app import storage
+from app.storage import close_pool, get_reader, get_writer, insert_messages, iter_messages
 
 
 @pytest.fixture
@@ -19,8 +24,64 @@ def client():
     return TestClient(app)
 
 
+@pytest.fixture(scope="session")
+def seeded_db(template_db, tmp_path_factory):
+    """Schema plus the sample messages, built once per test session."""
+    path = tmp_path_factory.mktemp("seeded") / "messages.db"
+    shutil.copyfile(template_db, path)
+    
+    with pytest.MonkeyPatch.context() as mp:
+        mp.setattr(settings, "DATABASE_URL", f"sqlite:///{path}")
+        
+        # Insert test messages
+        test_messages = [
+            {
+                "message_id": "msg-001",
+                "from_msisdn": "+1111111111",
+                "to_msisdn": "+2222222222",
+                "ts": "2024-01-01T10:00:00Z",
+                "text": "First message",
+                "created_at": "2024-01-01T10:00:00Z"
+            },
+            {
+                "message_id": "msg-002",
+                "from_msisdn": "+1111111111",
+                "to_msisdn": "+3333333333",
+                "ts": "2024-01-01T11:00:00Z",
+                "text": "Second message",
+                "created_at": "2024-01-01T11:00:00Z"
+            },
+            {
+                "message_id": "msg-003",
+                "from_msisdn": "+4444444444",
+                "to_msisdn": "+2222222222",
+                "ts": "2024-01-01T12:00:00Z",
+                "text": "Third message",
+                "created_at": "2024-01-01T12:00:00Z"
+            },
+            {
+                "message_id": "msg-004",
+                "from_msisdn": "+1111111111",
+                "to_msisdn": "+2222222222",
+                "ts": "2024-01-02T10:00:00Z",
+                "text": "Fourth message",
+                "created_at": "2024-01-02T10:00:00Z"
+            },
+        ]
+        
+        assert insert_messages(test_messages) == len(test_messages)
+        
+        # Planner statistics for the seeded data, as after a production bulk load
+        with get_writer() as conn:
+            conn.execute("ANALYZE")
+        
+        # Closing the pool checkpoints the WAL into the file that gets copied
+        close_pool()
+    return path
+
+
 @pytest.fixture(autouse=True)
-def setup_test_db(monkeypatch):
+def setup_test_db(monkeypatch, seeded_db):
     """Set up test database with sample data before each test."""
     # Create temporary database
     test_db_path = os.path.join(tempfile.gettempdir(), f'test_messages_{os.getpid()}.db')
@@ -36,51 +97,13 @@ def setup_test_db(monkeypatch):
     settings.DATABASE_URL = f"sqlite:///{test_db_path}"
     settings.WEBHOOK_SECRET = "test-secret-key"
     
-    # Initialize schema
-    init_schema()
-    
-    # Insert test messages
-    test_messages = [
-        {
-            "message_id": "msg-001",
-            "from_msisdn": "+1111111111",
-            "to_msisdn": "+2222222222",
-            "ts": "2024-01-01T10:00:00Z",
-            "text": "First message",
-            "created_at": "2024-01-01T10:00:00Z"
-        },
-        {
-            "message_id": "msg-002",
-            "from_msisdn": "+1111111111",
-            "to_msisdn": "+3333333333",
-            "ts": "2024-01-01T11:00:00Z",
-            "text": "Second message",
-            "created_at": "2024-01-01T11:00:00Z"
-        },
-        {
-            "message_id": "msg-003",
-            "from_msisdn": "+4444444444",
-            "to_msisdn": "+2222222222",
-            "ts": "2024-01-01T12:00:00Z",
-            "text": "Third message",
-            "created_at": "2024-01-01T12:00:00Z"
-        },
-        {
-            "message_id": "msg-004",
-            "from_msisdn": "+1111111111",
-            "to_msisdn": "+2222222222",
-            "ts": "2024-01-02T10:00:00Z",
-            "text": "Fourth message",
-            "created_at": "2024-01-02T10:00:00Z"
-        },
-    ]
-    
-    for msg in test_messages:
-        insert_message(msg)
+    # Start from the pre-seeded database
+    shutil.copyfile(seeded_db, test_db_path)
     
     yield
     
-    # Cleanup
+    # Cleanup (release pooled connections before deleting the file)
+    close_pool()
     if os.path.exists(test_db_path):
         os.unlink(test_db_path)
 
@@ -105,6 +128,22 @@ def test_pagination(client):
     data = response.json()
     assert len(data["data"]) == 2
     assert data["offset"] == 2
+    assert data["has_more"] is False
+
+
+def test_exact_count(client):
+    """Test total is only computed when exact_count=true."""
+    response = client.get("/messages?limit=1")
+    assert response.status_code == 200
+    data = response.json()
+    assert data["total"] is None
+    assert data["has_more"] is True
+    
+    response = client.get("/messages?limit=1&from=%2B1111111111&exact_count=true")
+    assert response.status_code == 200
+    data = response.json()
+    assert data["total"] == 3
+    assert len(data["data"]) == 1
 
 
 def test_filter_by_from_number(client):
@@ -161,3 +200,151 @@ def test_text_search(client):
     for msg in data["data"]:
         assert "First" in msg.get("text", "").lower() or "first" in msg.get("text", "").lower()
 
+
+
+def test_cursor_pagination(client):
+    """Test keyset pagination via next_cursor."""
+    response = client.get("/messages?limit=3")
+    assert response.status_code == 200
+    data = response.json()
+    assert [m["message_id"] for m in data["data"]] == ["msg-001", "msg-002", "msg-003"]
+    assert data["next_cursor"]
+    
+    response = client.get(f"/messages?limit=3&cursor={data['next_cursor']}")
+    assert response.status_code == 200
+    data = response.json()
+    assert [m["message_id"] for m in data["data"]] == ["msg-004"]
+    assert data["next_cursor"] is None
+    
+    # Malformed cursor
+    response = client.get("/messages?cursor=not-a-cursor")
+    assert response.status_code == 400
+
+
+def test_cursor_query_seeks_index():
+    """Test cursor pages seek the (ts, message_id) indexes instead of scanning."""
+    cases = [
+        (storage.FILTER_AFTER, ["2024-01-01T10:00:00Z", "msg-001", 2, 0]),
+        (storage.FILTER_FROM | storage.FILTER_AFTER, ["+1111111111", "2024-01-01T10:00:00Z", "msg-001", 2, 0]),
+    ]
+    with get_reader() as conn:
+        for mask, params in cases:
+            plan = " ".join(
+                row["detail"]
+                for row in conn.execute("EXPLAIN QUERY PLAN " + storage._LIST_SQL[mask], params)
+            )
+            assert "SEARCH messages" in plan
+            assert "(ts,message_id)>(?,?)" in plan
+            assert "SCAN messages" not in plan
+
+
+def test_text_search_substring(client):
+    """Test that text search is a case-insensitive substring match."""
+    response = client.get("/messages?q=COND%20mess")
+    assert response.status_code == 200
+    assert [m["message_id"] for m in response.json()["data"]] == ["msg-002"]
+    
+    # Terms shorter than a trigram still match
+    response = client.get("/messages?q=rd")
+    assert response.status_code == 200
+    assert [m["message_id"] for m in response.json()["data"]] == ["msg-003"]
+    
+    # LIKE wildcards in the term are literal
+    response = client.get("/messages?q=%25")
+    assert response.status_code == 200
+    assert response.json()["data"] == []
+
+
+def test_text_search_prefix(client):
+    """Test that a trailing * searches for messages starting with the term."""
+    response = client.get("/messages?q=f*")
+    assert response.status_code == 200
+    assert [m["message_id"] for m in response.json()["data"]] == ["msg-001", "msg-004"]
+    
+    # "message" appears in every text, but starts none of them
+    response = client.get("/messages?q=message*")
+    assert response.status_code == 200
+    assert response.json()["data"] == []
+
+
+def test_stream_ndjson(client):
+    """Test stream=true returns a header line followed by one row per line."""
+    response = client.get("/messages?limit=3&from=%2B1111111111&stream=true")
+    assert response.status_code == 200
+    assert response.headers["content-type"] == "application/x-ndjson"
+    
+    lines = [json.loads(line) for line in response.text.splitlines()]
+    assert lines[0]["fields"][0] == "message_id"
+    assert lines[0]["limit"] == 3
+    assert lines[0]["has_more"] is False
+    assert lines[0]["next_cursor"] is None
+    assert [m["message_id"] for m in lines[1:]] == ["msg-001", "msg-002", "msg-004"]
+    
+    # Follow next_cursor from the header across pages
+    seen = []
+    cursor = None
+    while True:
+        url = "/messages?limit=3&stream=true" + (f"&cursor={cursor}" if cursor else "")
+        lines = [json.loads(line) for line in client.get(url).text.splitlines()]
+        seen.extend(m["message_id"] for m in lines[1:])
+        if not lines[0]["has_more"]:
+            assert lines[0]["next_cursor"] is None
+            break
+        cursor = lines[0]["next_cursor"]
+    assert seen == ["msg-001", "msg-002", "msg-003", "msg-004"]
+    
+    # Malformed cursor is rejected before streaming starts
+    response = client.get("/messages?stream=true&cursor=not-a-cursor")
+    assert response.status_code == 400
+
+
+def test_stream_does_not_hold_reader(client, monkeypatch):
+    """Test a stalled stream doesn't keep a pooled reader from other requests."""
+    # Single-reader pool: a stream pinning its reader would starve everything else
+    close_pool()
+    pool = storage.ConnectionPool(parse_database_url(settings.DATABASE_URL), readers=1)
+    monkeypatch.setattr(storage, "_POOL", pool)
+    
+    # Header and first row sent, then the client stops reading
+    rows, has_more, next_cursor = iter_messages(limit=2)
+    lines = ndjson_lines(rows, 2, 0, has_more, next_cursor)
+    next(lines)
+    next(lines)
+    assert pool.readers.qsize() == 1
+    
+    response = client.get("/messages?limit=2")
+    assert response.status_code == 200
+    assert len(response.json()["data"]) == 2
+    lines.close()
+
+
+def test_fast_rows_matches_default(client, monkeypatch):
+    """Test FAST_ROWS (SQLite-rendered JSON) returns the same responses."""
+    urls = ["/messages?limit=3", "/messages?from=%2B1111111111&q=message", "/messages?q=zzz"]
+    expected = [client.get(url).json() for url in urls]
+    
+    monkeypatch.setattr(settings, "FAST_ROWS", True)
+    for url, body in zip(urls, expected):
+        response = client.get(url)
+        assert response.status_code == 200
+        assert response.json() == body
+
+
+def test_get_reader_when_pool_exhausted(client):
+    """Test get_reader falls back to a temporary connection instead of waiting."""
+    pool = storage._get_pool()
+    held = [pool.readers.get_nowait() for _ in range(storage.READER_POOL_SIZE)]
+    try:
+        response = client.get("/messages?limit=2")
+        assert response.status_code == 200
+        assert len(response.json()["data"]) == 2
+    finally:
+        for conn in held:
+            pool.readers.put(conn)
+
+
+def test_reader_connections_are_read_only():
+    """Test that pooled reader connections reject writes."""
+    with get_reader() as conn:
+        with pytest.raises(sqlite3.OperationalError):
+            conn.execute("DELETE FROM messages")
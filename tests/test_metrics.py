@@ -0,0 +1,54 @@
+"""
+Tests for /metrics:
+- Latency histogram exposition (cumulative buckets, count and sum)
+"""
+import pytest
+from fastapi.testclient import TestClient
+from app.main import app
+from app import metrics as metrics_module
+from app.metrics import HISTOGRAM_BUCKETS, MetricsCollector, record_latency
+
+
+@pytest.fixture
+def client():
+    """Create test client."""
+    return TestClient(app)
+
+
+@pytest.fixture(autouse=True)
+def fresh_metrics(monkeypatch):
+    """Start each test from an empty collector."""
+    monkeypatch.setattr(metrics_module, "metrics", MetricsCollector())
+
+
+def parse_exposition(text):
+    """Parse exposition lines into {series: value}."""
+    samples = {}
+    for line in text.splitlines():
+        series, value = line.rsplit(" ", 1)
+        samples[series] = float(value)
+    return samples
+
+
+def test_latency_histogram_exposition(client):
+    """Test buckets are cumulative, +Inf equals _count and _sum adds up."""
+    # A bound is inclusive: 5 lands in le="5"
+    latencies = [0.5, 5, 7, 7, 120, 6000]
+    for latency in latencies:
+        record_latency(latency)
+    
+    response = client.get("/metrics")
+    assert response.status_code == 200
+    samples = parse_exposition(response.text)
+    
+    expected = {
+        "1": 1, "5": 2, "10": 4, "25": 4, "50": 4, "100": 4,
+        "250": 5, "500": 5, "1000": 5, "2500": 5, "5000": 5, "+Inf": 6,
+    }
+    assert len(expected) == len(HISTOGRAM_BUCKETS)
+    for le, count in expected.items():
+        assert samples[f'http_request_latency_ms_bucket{{le="{le}"}}'] == count
+    
+    assert samples['http_request_latency_ms_bucket{le="+Inf"}'] == samples["http_request_latency_ms_count"]
+    assert samples["http_request_latency_ms_count"] == len(latencies)
+    assert samples["http_request_latency_ms_sum"] == pytest.approx(sum(latencies))
@@ -1,15 +1,16 @@
 """
 Tests for /stats endpoint:
 - Statistics correctness
+- Cache invalidation on insert
 """
 import pytest
 import tempfile
+import shutil
 import os
 from fastapi.testclient import TestClient
 from app.main import app
 from app.config import settings
-from app.models import init_schema
-from app.storage import insert_message
+from app.storage import close_pool, insert_message
 
 
 @pytest.fixture
@@ -19,7 +20,7 @@ def client():
 
 
 @pytest.fixture(autouse=True)
-def setup_test_db(monkeypatch):
+def setup_test_db(monkeypatch, template_db):
     """Set up test database before each test."""
     # Create temporary database
     test_db_path = os.path.join(tempfile.gettempdir(), f'test_stats_{os.getpid()}.db')
@@ -35,12 +36,13 @@ def setup_test_db(monkeypatch):
     settings.DATABASE_URL = f"sqlite:///{test_db_path}"
     settings.WEBHOOK_SECRET = "test-secret-key"
     
-    # Initialize schema
-    init_schema()
+    # Start from the pre-built schema
+    shutil.copyfile(template_db, test_db_path)
     
     yield
     
-    # Cleanup
+    # Cleanup (release pooled connections before deleting the file)
+    close_pool()
     if os.path.exists(test_db_path):
         os.unlink(test_db_path)
 
@@ -149,3 +151,20 @@ def test_stats_accuracy(client):
     sum_counts = sum(item["count"] for item in data["messages_per_sender"])
     assert sum_counts <= data["total_messages"]
 
+
+def test_stats_cache_invalidated_on_insert(client):
+    """Test that cached stats are refreshed by a new message."""
+    assert client.get("/stats").json()["total_messages"] == 0
+    
+    insert_message({
+        "message_id": "msg-cache",
+        "from_msisdn": "+1111111111",
+        "to_msisdn": "+2222222222",
+        "ts": "2024-01-01T10:00:00Z",
+        "text": "Fresh",
+        "created_at": "2024-01-01T10:00:00Z"
+    })
+    
+    data = client.get("/stats").json()
+    assert data["total_messages"] == 1
+    assert data["senders_count"] == 1
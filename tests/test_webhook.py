@@ -3,21 +3,24 @@ Tests for webhook endpoint:
 - Valid message insert
 - Duplicate message handling
 - HMAC signature validation
+- Group-committed writes
 """
+import asyncio
 import pytest
 import hmac
 import hashlib
 import json
 import tempfile
+import shutil
 import os
 from fastapi.testclient import TestClient
 from app.main import app
 from app.config import settings
-from app.models import init_schema
+from app.storage import close_pool, WriteBatcher
 
 
 @pytest.fixture(autouse=True)
-def setup_test_db(monkeypatch):
+def setup_test_db(monkeypatch, template_db):
     """Set up test database and settings before each test."""
     # Create temporary database
     test_db_path = os.path.join(tempfile.gettempdir(), f'test_webhook_{os.getpid()}.db')
@@ -36,12 +39,13 @@ def setup_test_db(monkeypatch):
     import app.routers.webhook
     monkeypatch.setattr(app.routers.webhook.settings, "WEBHOOK_SECRET", "test-secret-key")
     
-    # Initialize schema
-    init_schema()
+    # Start from the pre-built schema
+    shutil.copyfile(template_db, test_db_path)
     
     yield
     
-    # Cleanup
+    # Cleanup (release pooled connections before deleting the file)
+    close_pool()
     if os.path.exists(test_db_path):
         os.unlink(test_db_path)
 
@@ -181,3 +185,74 @@ def test_missing_signature(client):
     assert response.status_code == 401
     assert "invalid signature" in str(response.json()).lower()
 
+
+
+def test_invalid_payload(client):
+    """Test that payloads failing validation are rejected with 400."""
+    payload = {
+        "message_id": "msg-bad-msisdn",
+        "from": "1234567890",  # missing leading '+'
+        "to": "+0987654321",
+        "ts": "2024-01-01T10:00:00Z",
+    }
+    
+    body_bytes = json.dumps(payload, separators=(',', ':')).encode('utf-8')
+    signature = hmac.new(
+        "test-secret-key".encode('utf-8'),
+        body_bytes,
+        hashlib.sha256
+    ).hexdigest()
+    
+    response = client.post(
+        "/webhook",
+        content=body_bytes,
+        headers={
+            "X-Signature": signature,
+            "Content-Type": "application/json"
+        }
+    )
+    
+    assert response.status_code == 400
+    assert "validation error" in response.json()["detail"]
+
+
+def test_payload_too_large(client):
+    """Test that oversized bodies are rejected with 413 before verification."""
+    body_bytes = b"x" * (64 * 1024 + 1)
+    
+    response = client.post(
+        "/webhook",
+        content=body_bytes,
+        headers={
+            "X-Signature": "0" * 64,
+            "Content-Type": "application/json"
+        }
+    )
+    
+    assert response.status_code == 413
+
+
+def test_write_batcher_group_commit():
+    """Test concurrent writes share a batch and still report duplicates."""
+    def message(message_id):
+        return {
+            "message_id": message_id,
+            "from_msisdn": "+1234567890",
+            "to_msisdn": "+0987654321",
+            "ts": "2024-01-01T10:00:00Z",
+            "text": "Batched",
+            "created_at": "2024-01-01T10:00:00Z"
+        }
+    
+    async def run():
+        batcher = WriteBatcher()
+        batcher.start()
+        results = await asyncio.gather(
+            batcher.submit(message("batch-001")),
+            batcher.submit(message("batch-002")),
+            batcher.submit(message("batch-001"))
+        )
+        await batcher.stop()
+        return results
+    
+    assert asyncio.run(run()) == ["created", "created", "duplicate"]